@@ -0,0 +1,120 @@
+"""Background refresh of the displayed weather and the favorites."""
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from config import Config
+from weather_service import RateLimitedError, UpstreamUnavailableError, WeatherServiceError
+
+
+class AutoRefreshScheduler:
+    """
+    Calls ``refresh(target)`` for every target on a fixed interval.
+
+    * Targets of one round are refreshed one after another, ``stagger``
+      seconds apart, so a long favorites list never bursts.
+    * While paused (window hidden or minimized) or idle (no ``touch()`` for
+      ``idle_timeout`` seconds) nothing runs; the next round starts as soon
+      as the app is visible and used again.
+    * A target that fails on its own (e.g. a favorite the API no longer
+      knows) is logged and skipped. A round that hits an outage or the
+      rate limit (``UpstreamUnavailableError``, ``RateLimitedError``) stops
+      early and the interval doubles for every failed round in a row, up
+      to ``max_backoff``. Any other error is logged and counts as a failed
+      round; only cancelling ``run()`` stops the loop.
+
+    ``pause()``, ``resume()`` and ``touch()`` may be called from any thread.
+    """
+
+    def __init__(
+        self,
+        targets: Callable[[], Iterable[Any]],
+        refresh: Callable[[Any], Awaitable[None]],
+        interval: Optional[float] = None,
+        stagger: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.targets = targets
+        self.refresh = refresh
+        self.interval = interval or Config.AUTO_REFRESH_INTERVAL
+        self.stagger = Config.AUTO_REFRESH_STAGGER if stagger is None else stagger
+        self.idle_timeout = idle_timeout or Config.AUTO_REFRESH_IDLE_TIMEOUT
+        self.max_backoff = max_backoff or Config.AUTO_REFRESH_MAX_BACKOFF
+        self.clock = clock
+        self.paused = False
+        self.last_activity = clock()
+        self.consecutive_failures = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.stats = {"rounds": 0, "refreshed": 0, "skipped": 0, "failed_rounds": 0}
+
+    def next_delay(self) -> float:
+        """Seconds until the next round, including backoff and +-10% jitter."""
+        delay = min(self.interval * 2 ** self.consecutive_failures, self.max_backoff)
+        return delay * random.uniform(0.9, 1.1)
+
+    def is_idle(self) -> bool:
+        return self.clock() - self.last_activity > self.idle_timeout
+
+    def touch(self):
+        """Record user activity."""
+        self.last_activity = self.clock()
+        self._notify()
+
+    def pause(self):
+        """Stop refreshing, e.g. while the window is hidden."""
+        self.paused = True
+
+    def resume(self):
+        """Start refreshing again."""
+        self.paused = False
+        self._notify()
+
+    def _notify(self):
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def run(self):
+        """Refresh until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        while True:
+            await asyncio.sleep(self.next_delay())
+            # Catch up right away once the app is visible and used again
+            while self.paused or self.is_idle():
+                self._wake.clear()
+                await self._wake.wait()
+            try:
+                await self.run_round()
+            except Exception as e:
+                # A bug in one round (e.g. while rendering) must not end refreshing
+                # for the session; cancellation is not an Exception and still stops it
+                print(f"Auto-refresh round failed: {e!r}")
+                self.consecutive_failures += 1
+                self.stats["failed_rounds"] += 1
+
+    async def run_round(self):
+        """Refresh every target once, spaced ``stagger`` seconds apart."""
+        self.stats["rounds"] += 1
+        for i, target in enumerate(list(self.targets())):
+            if i:
+                await asyncio.sleep(self.stagger)
+            if self.paused:
+                return
+            try:
+                await self.refresh(target)
+            except (UpstreamUnavailableError, RateLimitedError) as e:
+                # Asking again for the other targets would only make it worse
+                print(f"Auto-refresh failed, backing off: {e}")
+                self.consecutive_failures += 1
+                self.stats["failed_rounds"] += 1
+                return
+            except WeatherServiceError as e:
+                print(f"Auto-refresh skipped {target or 'the shown city'}: {e}")
+                self.stats["skipped"] += 1
+                continue
+            self.stats["refreshed"] += 1
+        self.consecutive_failures = 0
@@ -0,0 +1,67 @@
+"""
+Micro-benchmark: decoding /forecast and /weather payloads.
+
+Compares the old path (``response.json()``, i.e. stdlib json into nested
+dicts), the stdlib path followed by model parsing, and the fast path in
+``fast_json`` (msgspec, orjson or json, whichever is installed).
+
+Usage (from the Weather_app folder):
+    python benchmarks/bench_decode.py [--number 2000]
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+sys.path.insert(0, str(APP_DIR))
+
+import fast_json  # noqa: E402
+from models import ForecastSeries, WeatherSnapshot  # noqa: E402
+
+
+def load_fixtures(prefix: str):
+    """Read the raw bytes of every recorded fixture with the given prefix."""
+    return [path.read_bytes() for path in sorted(FIXTURES_DIR.glob(f"{prefix}_*.json"))]
+
+
+def bench(label: str, func, payloads, number: int):
+    """Time ``func`` over all payloads and print microseconds per decode."""
+    def run():
+        for payload in payloads:
+            func(payload)
+
+    best = min(timeit.repeat(run, number=number, repeat=5))
+    per_decode = best / (number * len(payloads)) * 1e6
+    print(f"  {label:<32} {per_decode:9.1f} µs/decode")
+    return per_decode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000, help="iterations per timing run")
+    args = parser.parse_args()
+
+    print(f"fast_json decoder: {fast_json.DECODER}")
+
+    cases = [
+        ("forecast", ForecastSeries.from_api, fast_json.decode_forecast),
+        ("weather", WeatherSnapshot.from_api, fast_json.decode_weather),
+    ]
+    for prefix, from_api, fast_decode in cases:
+        payloads = load_fixtures(prefix)
+        if not payloads:
+            print(f"No {prefix} fixtures found in {FIXTURES_DIR}")
+            continue
+
+        print(f"\n/{prefix} ({len(payloads)} fixtures, {sum(map(len, payloads)) // len(payloads)} bytes avg)")
+        baseline = bench("response.json() (raw dicts)", json.loads, payloads, args.number)
+        bench("json.loads + from_api", lambda p: from_api(json.loads(p)), payloads, args.number)
+        fast = bench(f"fast_json ({fast_json.DECODER})", fast_decode, payloads, args.number)
+        print(f"  speed-up vs response.json(): {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Load benchmark for WeatherService against the local mock API.
+
+Starts ``mock_owm_server`` in-process, then drives weather, forecast and
+``get_weather_many`` lookups with many concurrent callers and reports
+p50/p95/p99 latency, ops/s, upstream requests/s as counted by the server
+and how many TCP connections the service opened (connection reuse). Runs
+fully offline.
+
+Without ``--cache`` the weather and forecast scenarios bypass the cache
+and in-flight request sharing, so each op is one upstream request; with
+``--cache`` they use the public methods and show what caching saves.
+
+Usage (from the Weather_app folder):
+    python benchmarks/bench_service.py --requests 500 --concurrency 20 --latency 0.02
+    python benchmarks/bench_service.py --cold        # new client per request (old behaviour)
+    python benchmarks/bench_service.py --cache       # with the response cache enabled
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mock_owm_server import MockOpenWeatherMap  # noqa: E402
+from resilience import TokenBucket  # noqa: E402
+from weather_service import WeatherService, WeatherServiceError  # noqa: E402
+
+CITIES = ["London", "Tokyo", "Manila", "New York"]
+
+
+def percentile(samples: List[float], pct: int) -> float:
+    """Return the given percentile of the samples (in the samples' unit)."""
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+async def run_load(operation: Callable[[int], Awaitable], total: int, concurrency: int):
+    """Run ``operation(i)`` ``total`` times with at most ``concurrency`` in flight."""
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                await operation(index)
+            except WeatherServiceError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def report(name: str, latencies: List[float], errors: int, elapsed: float, mock: MockOpenWeatherMap, before):
+    """Print one result line for a scenario."""
+    requests = mock.requests_served - before[0]
+    connections = mock.connections_opened - before[1]
+    ms = [value * 1000 for value in latencies]
+    reuse = f"{requests / connections:6.1f}" if connections else "     -"
+    print(
+        f"{name:<10} {len(latencies):>6} {errors:>6} {len(latencies) / elapsed:>9.1f} "
+        f"{requests / elapsed:>9.1f} "
+        f"{percentile(ms, 50):>8.1f} {percentile(ms, 95):>8.1f} {percentile(ms, 99):>8.1f} "
+        f"{requests:>8} {connections:>6} {reuse}"
+    )
+
+
+async def main_async(args):
+    mock = MockOpenWeatherMap(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=1,
+    )
+    server = await mock.start()
+    host, port = server.sockets[0].getsockname()[:2]
+    api = f"http://{host}:{port}/data/2.5"
+
+    def make_service() -> WeatherService:
+        return WeatherService(
+            base_url=f"{api}/weather",
+            forecast_url=f"{api}/forecast",
+            use_cache=args.cache,
+            # The benchmark measures the client, not the free-tier quota
+            rate_limiter=TokenBucket(rate=1e9, capacity=1e9),
+            max_connections=args.concurrency,
+            max_keepalive_connections=args.concurrency,
+        )
+
+    shared = make_service()
+
+    async def call(method: str, *call_args):
+        if args.cold:
+            async with make_service() as service:
+                return await getattr(service, method)(*call_args)
+        return await getattr(shared, method)(*call_args)
+
+    # Only 4 cities have fixtures, so concurrent get_weather calls would
+    # mostly share in-flight requests. Without --cache, call the uncached
+    # fetches so every op is one upstream request and the numbers measure
+    # the client and its pool.
+    if args.cache:
+        weather_method, forecast_method = "get_weather", "get_forecast"
+    else:
+        weather_method, forecast_method = "_fetch_weather", "_fetch_forecast"
+    scenarios = [
+        ("weather", lambda i: call(weather_method, CITIES[i % len(CITIES)]), args.requests),
+        ("forecast", lambda i: call(forecast_method, CITIES[i % len(CITIES)]), args.requests),
+        # Goes through get_weather, so concurrent batches may share requests
+        ("batch", lambda i: call("get_weather_many", CITIES), max(1, args.requests // len(CITIES))),
+    ]
+
+    mode = "cold client per request" if args.cold else "shared pooled client"
+    lookups = "cache and request sharing on" if args.cache else "cache and request sharing off"
+    print(f"{mode}; {lookups}; latency {args.latency * 1000:.0f} ms; concurrency {args.concurrency}")
+    print(f"{'scenario':<10} {'ops':>6} {'errors':>6} {'ops/s':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'requests':>8} {'conns':>6} {'req/conn':>6}")
+
+    try:
+        for name, operation, total in scenarios:
+            before = (mock.requests_served, mock.connections_opened)
+            latencies, errors, elapsed = await run_load(operation, total, args.concurrency)
+            report(name, latencies, errors, elapsed, mock, before)
+    finally:
+        await shared.aclose()
+        server.close()
+        await server.wait_closed()
+
+    if args.cache:
+        print(f"cache: {shared.stats().get('cache')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WeatherService against the local mock API.")
+    parser.add_argument("--requests", type=int, default=400, help="operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated server latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="extra random latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of injected 503 errors")
+    parser.add_argument("--cache", action="store_true", help="enable the response cache")
+    parser.add_argument("--cold", action="store_true", help="open a new client for every request")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Startup benchmark for the Weather App.
+
+Reports two things, each from fresh interpreters:
+
+* ``-X importtime`` for ``import main``: total import time and the
+  slowest modules main pulls in, plus whether heavy optional imports
+  (numpy, httpx) are still on the startup path.
+* Time to first frame: the app is started against a headless stand-in for
+  ``ft.Page`` with ``WEATHER_APP_STARTUP_PROBE=1`` and timed until it
+  reports that the skeleton UI was added, then until the saved state has
+  loaded. The database, caches and downloaded icons all go to an empty
+  temporary folder, so it measures a first start and never touches your
+  history or the app's assets folder.
+
+Use ``--budget-ms`` to fail (exit code 1) when the median time to first
+frame gets slower than a budget, e.g. in CI.
+
+Usage (from the Weather_app folder):
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --runs 10 --budget-ms 1500
+"""
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+APP_DIR = Path(__file__).resolve().parent.parent
+WATCHED_MODULES = ("numpy", "httpx", "forecast_engine", "gazetteer", "storage")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+FIRST_FRAME_LINE = re.compile(r"First frame after ([\d.]+) ms")
+STATE_LINE = re.compile(r"State loaded after ([\d.]+) ms")
+
+
+def measure_imports() -> Tuple[float, List[Tuple[str, float]], Dict[str, bool]]:
+    """
+    Run ``python -X importtime -c "import main"`` once.
+
+    Returns:
+        Total milliseconds for ``import main``, ``(module, ms)`` for the
+        direct imports of main (slowest first), and which watched modules
+        were imported
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=APP_DIR, capture_output=True, text=True, check=True,
+    )
+    total = 0.0
+    direct: List[Tuple[str, float]] = []
+    imported = {name: False for name in WATCHED_MODULES}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        depth = len(match.group(3)) // 2
+        name = match.group(4)
+        if name in imported:
+            imported[name] = True
+        # main's own imports are listed just before it, one level deeper
+        if name == "main" and depth == 0:
+            total = cumulative_ms
+        elif depth == 1:
+            direct.append((name, cumulative_ms))
+    direct.sort(key=lambda item: item[1], reverse=True)
+    return total, direct, imported
+
+
+def measure_first_frame() -> Tuple[float, float, float]:
+    """
+    Start the app in a child process once.
+
+    Returns:
+        Milliseconds from process start to the first frame (wall clock, as
+        seen from here), from importing main to the first frame, and from
+        importing main until the saved state was loaded
+    """
+    env = dict(os.environ, WEATHER_APP_STARTUP_PROBE="1")
+    with tempfile.TemporaryDirectory() as state_dir:
+        started = time.perf_counter()
+        child = subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--child"],
+            cwd=state_dir, env=env, stdout=subprocess.PIPE, text=True,
+        )
+        wall_ms = first_frame_ms = state_ms = 0.0
+        for line in child.stdout:
+            match = FIRST_FRAME_LINE.search(line)
+            if match:
+                wall_ms = (time.perf_counter() - started) * 1000
+                first_frame_ms = float(match.group(1))
+            match = STATE_LINE.search(line)
+            if match:
+                state_ms = float(match.group(1))
+        if child.wait() != 0 or not wall_ms:
+            raise RuntimeError("The app did not report its first frame")
+    return wall_ms, first_frame_ms, state_ms
+
+
+class HeadlessPage:
+    """Just enough of ``ft.Page`` for WeatherApp to start without a Flet client."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.window = types.SimpleNamespace(center=lambda: None)
+        self.tasks: List[asyncio.Task] = []
+
+    def add(self, *controls):
+        pass
+
+    def update(self, *controls):
+        pass
+
+    def run_task(self, handler, *args):
+        task = self.loop.create_task(handler(*args))
+        self.tasks.append(task)
+        return task
+
+
+async def run_child():
+    """Start the app headless and report when its saved state is loaded."""
+    sys.path.insert(0, str(APP_DIR))
+    import main
+
+    page = HeadlessPage(asyncio.get_running_loop())
+    app = main.WeatherApp(page)
+    # Icons go to the temporary folder too, not the app's assets folder
+    app.icons = main.IconCache(app.weather_service.fetch_asset, Path.cwd() / main.Config.ASSETS_DIR / "icons")
+    await page.tasks[0]  # load_state
+    print(f"State loaded after {(time.perf_counter() - main._STARTED) * 1000:.1f} ms", flush=True)
+    for task in page.tasks:
+        task.cancel()
+    await asyncio.gather(*page.tasks, return_exceptions=True)
+    await app.on_close(None)
+
+
+def median(samples: List[float]) -> float:
+    return statistics.median(samples) if samples else 0.0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure import time and time to first frame.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per measurement")
+    parser.add_argument("--top", type=int, default=8, help="slowest direct imports to list")
+    parser.add_argument("--budget-ms", type=float, help="fail if the median time to first frame is slower")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        asyncio.run(run_child())
+        return 0
+
+    imports = [measure_imports() for _ in range(args.runs)]
+    print(f"import main: {median([total for total, _, _ in imports]):.1f} ms (median of {args.runs})")
+    for name, ms in imports[-1][1][:args.top]:
+        print(f"  {name:<24} {ms:8.1f} ms")
+    watched = ", ".join(f"{name}={'yes' if seen else 'no'}" for name, seen in imports[-1][2].items())
+    print(f"  imported at startup: {watched}")
+
+    frames = [measure_first_frame() for _ in range(args.runs)]
+    first_frame = median([wall for wall, _, _ in frames])
+    print(f"first frame: {first_frame:.1f} ms from process start, "
+          f"{median([ms for _, ms, _ in frames]):.1f} ms after main.py started")
+    print(f"state loaded: {median([ms for _, _, ms in frames]):.1f} ms after main.py started")
+
+    if args.budget_ms is not None and first_frame > args.budget_ms:
+        print(f"FAIL: first frame {first_frame:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
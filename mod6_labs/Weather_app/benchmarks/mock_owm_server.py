@@ -0,0 +1,196 @@
+"""
+Local stand-in for the OpenWeatherMap API, serving the recorded fixtures.
+
+It can be used two ways:
+
+* as a real HTTP/1.1 server with keep-alive, so connection reuse can be
+  measured (``connections_opened`` vs ``requests_served``)::
+
+      python benchmarks/mock_owm_server.py --port 8765 --latency 0.05
+      # then point the app at it:
+      OPENWEATHER_BASE_URL=http://127.0.0.1:8765/data/2.5/weather \\
+      OPENWEATHER_FORECAST_URL=http://127.0.0.1:8765/data/2.5/forecast \\
+      python main.py
+
+* in-process through ``httpx.MockTransport`` via ``transport()``.
+
+Cities are looked up by fixture name (``weather_<city>.json``, e.g.
+``q=New York`` -> ``weather_new_york.json``) or by the city ID inside the
+fixture (``id=2643743``); unknown cities get a 404 like the real API. Latency, jitter and error injection are configurable.
+"""
+import argparse
+import asyncio
+import json
+import random
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+NOT_FOUND_BODY = b'{"cod":"404","message":"city not found"}'
+ERROR_BODY = b'{"cod":"503","message":"service unavailable"}'
+RATE_LIMIT_BODY = b'{"cod":429,"message":"rate limit exceeded"}'
+
+REASONS = {200: "OK", 404: "Not Found", 429: "Too Many Requests", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+
+class MockOpenWeatherMap:
+    """Serves ``/data/2.5/weather`` and ``/data/2.5/forecast`` from fixtures."""
+
+    def __init__(
+        self,
+        fixtures_dir: Path = FIXTURES_DIR,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.fixtures: Dict[Tuple[str, str], bytes] = {}
+        self.fixtures_by_id: Dict[Tuple[str, str], bytes] = {}
+        for path in sorted(fixtures_dir.glob("*.json")):
+            endpoint, _, city = path.stem.partition("_")
+            body = path.read_bytes()
+            self.fixtures[(endpoint, city)] = body
+            payload = json.loads(body)
+            city_id = payload.get("id") or payload.get("city", {}).get("id")
+            if city_id is not None:
+                self.fixtures_by_id[(endpoint, str(city_id))] = body
+        self.requests_served = 0
+        self.connections_opened = 0
+        self.errors_injected = 0
+
+    @staticmethod
+    def _slug(city: str) -> str:
+        return "_".join(city.split(",")[0].split()).lower()
+
+    async def handle(self, path: str, params: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """Build the ``(status, headers, body)`` response for one request."""
+        self.requests_served += 1
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors_injected += 1
+            if self.error_status == 429:
+                return 429, {"Retry-After": "0"}, RATE_LIMIT_BODY
+            return self.error_status, {}, ERROR_BODY
+
+        endpoint = path.rstrip("/").rsplit("/", 1)[-1]
+        if "q" in params:
+            body = self.fixtures.get((endpoint, self._slug(params["q"])))
+        elif "id" in params:
+            body = self.fixtures_by_id.get((endpoint, params["id"]))
+        else:
+            # Coordinates: answer with the first fixture for the endpoint
+            body = next((data for (name, _), data in self.fixtures.items() if name == endpoint), None)
+
+        if body is None:
+            return 404, {}, NOT_FOUND_BODY
+        return 200, {}, body
+
+    def transport(self) -> httpx.MockTransport:
+        """Return an in-process transport for ``WeatherService(transport=...)``."""
+        async def handler(request: httpx.Request) -> httpx.Response:
+            status, headers, body = await self.handle(request.url.path, dict(request.url.params))
+            return httpx.Response(status, headers=headers, content=body)
+
+        return httpx.MockTransport(handler)
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answer requests on one keep-alive connection until the client closes it."""
+        self.connections_opened += 1
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                _method, target, _version = lines[0].split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                url = urlsplit(target)
+                status, extra_headers, body = await self.handle(url.path, dict(parse_qsl(url.query)))
+
+                response_headers = {
+                    "Content-Type": "application/json; charset=utf-8",
+                    "Content-Length": str(len(body)),
+                    "Connection": "keep-alive",
+                    **extra_headers,
+                }
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n".encode("latin-1")
+                    + "".join(f"{k}: {v}\r\n" for k, v in response_headers.items()).encode("latin-1")
+                    + b"\r\n"
+                    + body
+                )
+                await writer.drain()
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        """Start listening; use port 0 to pick a free port."""
+        return await asyncio.start_server(self._serve_connection, host, port)
+
+    def stats(self) -> Dict[str, int]:
+        """Return request and connection counters."""
+        return {
+            "requests_served": self.requests_served,
+            "connections_opened": self.connections_opened,
+            "errors_injected": self.errors_injected,
+        }
+
+
+async def _serve_forever(args):
+    mock = MockOpenWeatherMap(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )
+    server = await mock.start(args.host, args.port)
+    host, port = server.sockets[0].getsockname()[:2]
+    cities = sorted({city for (_, city) in mock.fixtures})
+    print(f"Mock OpenWeatherMap on http://{host}:{port}/data/2.5/ (cities: {', '.join(cities)})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        print(json.dumps(mock.stats()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the OpenWeatherMap API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="status code of injected failures")
+    try:
+        asyncio.run(_serve_forever(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Ordered, name-normalized collections of cities (favorites and history)."""
+import unicodedata
+from collections import OrderedDict
+from itertools import islice
+from typing import Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+def normalize_city(city: str) -> str:
+    """
+    Key used to match city names.
+
+    Ignores case and extra spaces, and applies NFKC so composed and
+    decomposed spellings ("São Paulo" typed either way) or full-width
+    characters compare equal.
+    """
+    text = unicodedata.normalize("NFKC", city)
+    text = unicodedata.normalize("NFKC", text.casefold())
+    return " ".join(text.split())
+
+
+class CityIndex(Generic[V]):
+    """
+    Insertion-ordered mapping from a city name to a value.
+
+    Lookups use ``normalize_city`` so "london", " London " and "LONDON"
+    are the same entry. Membership, add, move-to-front and removal are all
+    O(1); iterating yields the values in order.
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, V]] = ()):
+        self._entries: "OrderedDict[str, V]" = OrderedDict()
+        for city, value in items:
+            self._entries.setdefault(normalize_city(city), value)
+
+    def __contains__(self, city: object) -> bool:
+        return isinstance(city, str) and normalize_city(city) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[V]:
+        return iter(self._entries.values())
+
+    def get(self, city: str, default: Optional[V] = None) -> Optional[V]:
+        """Return the value for a city, or ``default``."""
+        return self._entries.get(normalize_city(city), default)
+
+    def add(self, city: str, value: V) -> bool:
+        """Append a city if it is not there yet; returns whether it was added."""
+        key = normalize_city(city)
+        if key in self._entries:
+            return False
+        self._entries[key] = value
+        return True
+
+    def push_front(self, city: str, value: V):
+        """Insert or replace a city's value and move it to the front."""
+        key = normalize_city(city)
+        self._entries[key] = value
+        self._entries.move_to_end(key, last=False)
+
+    def remove(self, city: str) -> Optional[V]:
+        """Remove a city; returns its value, or None if it was not there."""
+        return self._entries.pop(normalize_city(city), None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def first(self) -> Optional[V]:
+        """Return the value at the front, or None if empty."""
+        return next(iter(self._entries.values()), None)
+
+    def head(self, count: int) -> List[V]:
+        """Return the first ``count`` values."""
+        return list(islice(self._entries.values(), count))
@@ -14,6 +14,10 @@ class Config:
         "OPENWEATHER_BASE_URL",
         "https://api.openweathermap.org/data/2.5/weather"
     )
+    FORECAST_URL = os.getenv(
+        "OPENWEATHER_FORECAST_URL",
+        "https://api.openweathermap.org/data/2.5/forecast"
+    )
     
     # App Configuration
     APP_TITLE = "Weather App"
@@ -24,6 +28,63 @@ class Config:
     UNITS = "metric"  # metric, imperial, or standard
     TIMEOUT = 10  # seconds
     
+    # HTTP Client Settings (one pooled client is shared by all requests)
+    MAX_CONNECTIONS = 10
+    MAX_KEEPALIVE_CONNECTIONS = 5
+    KEEPALIVE_EXPIRY = 60  # seconds an idle connection is kept open
+    HTTP2 = os.getenv("OPENWEATHER_HTTP2", "1") == "1"  # used only if 'h2' is installed
+    
+    # Response Cache Settings
+    CACHE_TTLS = {
+        "weather": 600,    # current conditions update about every 10 minutes
+        "forecast": 1800,  # the 3-hourly forecast changes far less often
+    }
+    CACHE_MAX_ENTRIES = 128
+    CACHE_STALE_TTL = 3600  # seconds an expired entry may be served while refreshing
+    STALE_WHILE_REVALIDATE = True
+    PERSISTENT_CACHE_FILE = "weather_cache.db"  # last payload per city, kept across restarts
+    PERSISTENT_CACHE_MAX_ENTRIES = 200
+    
+    # Batch Lookups (favorites dashboard)
+    BATCH_CONCURRENCY = 4  # parallel requests, keeps bursts under the free-tier limit
+    
+    # Rate Limiting and Retries
+    RATE_LIMIT_PER_MINUTE = 60  # free-tier quota, shared by the whole process
+    RATE_LIMIT_BURST = 10
+    MAX_RETRIES = 2  # for timeouts, network errors, 429 and 5xx responses
+    RETRY_BASE_DELAY = 0.5  # seconds, doubled on every attempt (with jitter)
+    RETRY_MAX_DELAY = 8
+    CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive failures before we stop calling the API
+    CIRCUIT_RESET_TIMEOUT = 30  # seconds before a trial request is allowed again
+    
+    # Local State
+    STATE_DB_FILE = "weather_app.db"  # history, favorites and preferences
+    SAVE_DEBOUNCE = 0.5  # seconds to batch history/favorites/preference writes
+    HISTORY_DISPLAY_LIMIT = 10  # rows shown in the history dropdown (all searches are kept)
+    
+    # City Suggestions
+    CITY_LIST_FILE = os.getenv("OPENWEATHER_CITY_LIST", "city.list.json.gz")  # OWM bulk city list
+    SUGGEST_DEBOUNCE = 0.25  # seconds of typing pause before suggestions update
+    SUGGESTION_LIMIT = 6
+    
+    # Auto-refresh
+    AUTO_REFRESH_INTERVAL = 600  # seconds between background refreshes (matches the weather cache TTL)
+    AUTO_REFRESH_MAX_AGE = 300  # a round fetches anything cached longer ago, fresh or not
+    AUTO_REFRESH_STAGGER = 2  # seconds between the requests of one refresh round
+    AUTO_REFRESH_IDLE_TIMEOUT = 1800  # pause after this long without user activity
+    AUTO_REFRESH_MAX_BACKOFF = 3600  # longest interval after repeated failures
+    
+    # Weather Icons
+    ICON_URL = "https://openweathermap.org/img/wn/{code}@2x.png"
+    ASSETS_DIR = "assets"  # served by Flet, next to main.py; icons are kept in assets/icons
+    ICON_PREWARM_CONCURRENCY = 4  # icons downloaded at once on first start
+    
+    # UI Updates
+    UI_MAX_FPS = 60  # upper bound on page updates sent per second
+    
+    # Startup
+    STARTUP_PROBE = os.getenv("WEATHER_APP_STARTUP_PROBE") == "1"  # print time to first frame
+    
     @classmethod
     def validate(cls):
         """Validate that required configuration is present."""
@@ -32,7 +93,4 @@ class Config:
                 "OPENWEATHER_API_KEY not found. "
                 "Please create a .env file with your API key."
             )
-        return True
-
-# Validate configuration on import
-Config.validate()
\ No newline at end of file
+        return True
\ No newline at end of file
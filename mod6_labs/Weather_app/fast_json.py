@@ -0,0 +1,146 @@
+"""
+Fast decoding of OpenWeatherMap responses into the compact models.
+
+Uses msgspec when it is installed (decodes the bytes straight into typed
+structs, skipping every field the app doesn't need), otherwise orjson,
+otherwise the standard library ``json`` module.
+"""
+import json
+from typing import List
+
+from models import ForecastPoint, ForecastSeries, WeatherSnapshot
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    loads = orjson.loads
+else:
+    loads = json.loads
+
+
+if msgspec is not None:
+    # Only the fields the app reads are declared; msgspec skips the rest
+    # of the payload without building Python objects for it.
+
+    class _Main(msgspec.Struct):
+        temp: float = 0
+        feels_like: float = 0
+        temp_min: float = 0
+        temp_max: float = 0
+        humidity: int = 0
+        pressure: int = 0
+
+    class _Condition(msgspec.Struct):
+        id: int = 800
+        icon: str = "01d"
+        description: str = ""
+
+    class _Wind(msgspec.Struct):
+        speed: float = 0
+
+    class _Clouds(msgspec.Struct):
+        all: int = 0
+
+    class _Sys(msgspec.Struct):
+        country: str = ""
+
+    class _Weather(msgspec.Struct):
+        name: str = "Unknown"
+        dt: int = 0
+        main: _Main = msgspec.field(default_factory=_Main)
+        weather: List[_Condition] = msgspec.field(default_factory=list)
+        wind: _Wind = msgspec.field(default_factory=_Wind)
+        clouds: _Clouds = msgspec.field(default_factory=_Clouds)
+        sys: _Sys = msgspec.field(default_factory=_Sys)
+
+    class _ForecastItem(msgspec.Struct):
+        dt: int = 0
+        main: _Main = msgspec.field(default_factory=_Main)
+        weather: List[_Condition] = msgspec.field(default_factory=list)
+        wind: _Wind = msgspec.field(default_factory=_Wind)
+        pop: float = 0
+
+    class _City(msgspec.Struct):
+        name: str = "Unknown"
+        country: str = ""
+        timezone: int = 0
+
+    class _Forecast(msgspec.Struct, rename={"items": "list"}):
+        city: _City = msgspec.field(default_factory=_City)
+        items: List[_ForecastItem] = msgspec.field(default_factory=list)
+
+    _weather_decoder = msgspec.json.Decoder(_Weather)
+    _forecast_decoder = msgspec.json.Decoder(_Forecast)
+
+    _DEFAULT_CONDITION = _Condition()
+
+    def decode_weather(content: bytes) -> WeatherSnapshot:
+        """Decode a /weather response body."""
+        data = _weather_decoder.decode(content)
+        condition = data.weather[0] if data.weather else _DEFAULT_CONDITION
+        return WeatherSnapshot(
+            city_name=data.name,
+            country=data.sys.country,
+            dt=data.dt,
+            temp=data.main.temp,
+            feels_like=data.main.feels_like,
+            temp_min=data.main.temp_min,
+            temp_max=data.main.temp_max,
+            humidity=data.main.humidity,
+            pressure=data.main.pressure,
+            wind_speed=data.wind.speed,
+            cloudiness=data.clouds.all,
+            weather_id=condition.id,
+            icon_code=condition.icon,
+            description=condition.description.title(),
+        )
+
+    def decode_forecast(content: bytes) -> ForecastSeries:
+        """Decode a /forecast response body."""
+        data = _forecast_decoder.decode(content)
+        points = []
+        for item in data.items:
+            condition = item.weather[0] if item.weather else _DEFAULT_CONDITION
+            points.append(
+                ForecastPoint(
+                    dt=item.dt,
+                    temp=item.main.temp,
+                    temp_min=item.main.temp_min,
+                    temp_max=item.main.temp_max,
+                    humidity=item.main.humidity,
+                    wind_speed=item.wind.speed,
+                    pop=item.pop,
+                    weather_id=condition.id,
+                    icon_code=condition.icon,
+                    description=condition.description.title(),
+                )
+            )
+        return ForecastSeries(
+            city_name=data.city.name,
+            country=data.city.country,
+            timezone=data.city.timezone,
+            points=tuple(points),
+        )
+
+    DECODER = "msgspec"
+
+else:
+
+    def decode_weather(content: bytes) -> WeatherSnapshot:
+        """Decode a /weather response body."""
+        return WeatherSnapshot.from_api(loads(content))
+
+    def decode_forecast(content: bytes) -> ForecastSeries:
+        """Decode a /forecast response body."""
+        return ForecastSeries.from_api(loads(content))
+
+    DECODER = "orjson" if orjson is not None else "json"
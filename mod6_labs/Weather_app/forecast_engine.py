@@ -0,0 +1,139 @@
+"""Vectorized daily aggregation of the 3-hourly forecast with NumPy."""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List
+
+import numpy as np
+
+from models import ForecastSeries
+
+SECONDS_PER_DAY = 86400
+SAMPLES_PER_DAY = 8  # the API returns one point every 3 hours
+
+
+@dataclass(frozen=True)
+class ForecastArrays:
+    """Columnar view of a ForecastSeries, one NumPy array per field."""
+
+    __slots__ = ("timestamps", "local_days", "local_hours", "temp", "temp_min",
+                 "temp_max", "humidity", "wind_speed", "pop", "icon_codes")
+
+    timestamps: np.ndarray  # unix seconds (UTC)
+    local_days: np.ndarray  # days since epoch in the city's timezone
+    local_hours: np.ndarray
+    temp: np.ndarray
+    temp_min: np.ndarray
+    temp_max: np.ndarray
+    humidity: np.ndarray
+    wind_speed: np.ndarray
+    pop: np.ndarray
+    icon_codes: np.ndarray
+
+    @classmethod
+    def from_series(cls, series: ForecastSeries) -> "ForecastArrays":
+        """Convert the list of forecast points into columns."""
+        points = series.points
+        timestamps = np.fromiter((p.dt for p in points), dtype=np.int64, count=len(points))
+        local = timestamps + series.timezone
+        return cls(
+            timestamps=timestamps,
+            local_days=local // SECONDS_PER_DAY,
+            local_hours=(local % SECONDS_PER_DAY) // 3600,
+            temp=np.fromiter((p.temp for p in points), dtype=np.float64, count=len(points)),
+            temp_min=np.fromiter((p.temp_min for p in points), dtype=np.float64, count=len(points)),
+            temp_max=np.fromiter((p.temp_max for p in points), dtype=np.float64, count=len(points)),
+            humidity=np.fromiter((p.humidity for p in points), dtype=np.float64, count=len(points)),
+            wind_speed=np.fromiter((p.wind_speed for p in points), dtype=np.float64, count=len(points)),
+            pop=np.fromiter((p.pop for p in points), dtype=np.float64, count=len(points)),
+            icon_codes=np.array([p.icon_code for p in points], dtype=object),
+        )
+
+
+@dataclass(frozen=True)
+class DailyForecast:
+    """Per-day aggregates (temperatures in Celsius), one array element per day."""
+
+    __slots__ = ("days", "temp_min", "temp_max", "temp_mean", "humidity_mean",
+                 "wind_max", "pop_max", "trend", "icon_codes", "rolling_temp")
+
+    days: np.ndarray  # local days since epoch
+    temp_min: np.ndarray
+    temp_max: np.ndarray
+    temp_mean: np.ndarray
+    humidity_mean: np.ndarray
+    wind_max: np.ndarray
+    pop_max: np.ndarray
+    trend: np.ndarray  # change of the daily mean vs the previous day
+    icon_codes: np.ndarray  # icon of the point closest to local noon
+    rolling_temp: np.ndarray  # 24-hour rolling mean of the 3-hourly temperature
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def day_names(self) -> List[str]:
+        """Short weekday names ('Mon', 'Tue', ...) for each day."""
+        return [
+            datetime.fromtimestamp(int(day) * SECONDS_PER_DAY, tz=timezone.utc).strftime("%a")
+            for day in self.days
+        ]
+
+
+def celsius_to_fahrenheit(values: np.ndarray) -> np.ndarray:
+    """Convert an array of Celsius temperatures to Fahrenheit."""
+    return values * 9 / 5 + 32
+
+
+def rolling_mean(values: np.ndarray, window: int = SAMPLES_PER_DAY) -> np.ndarray:
+    """Trailing rolling mean; the first values average over what is available."""
+    if len(values) == 0:
+        return values.astype(np.float64)
+    sums = np.cumsum(values, dtype=np.float64)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts = np.minimum(np.arange(1, len(values) + 1), window)
+    return sums / counts
+
+
+def summarize_daily(series: ForecastSeries, max_days: int = 5) -> DailyForecast:
+    """
+    Aggregate the 3-hourly forecast into daily values.
+
+    Every statistic is computed with ``reduceat`` over the day boundaries,
+    so the whole series is processed in one vectorized pass.
+
+    Args:
+        series: Forecast returned by ``WeatherService.get_forecast``
+        max_days: Number of days to keep
+
+    Returns:
+        DailyForecast with temperatures in Celsius
+    """
+    cols = ForecastArrays.from_series(series)
+    if len(cols.timestamps) == 0:
+        empty = np.empty(0)
+        return DailyForecast(empty, empty, empty, empty, empty, empty, empty, empty,
+                             np.empty(0, dtype=object), empty)
+
+    # Points come sorted by time, so each day is one contiguous run
+    days, starts, counts = np.unique(cols.local_days, return_index=True, return_counts=True)
+
+    temp_mean = np.add.reduceat(cols.temp, starts) / counts
+    trend = np.diff(temp_mean, prepend=temp_mean[0])
+
+    # Pick the icon of the point nearest local noon for each day
+    distance = np.abs(cols.local_hours - 12)
+    day_index = np.repeat(np.arange(len(days)), counts)
+    order = np.lexsort((distance, day_index))
+    noon_points = order[np.searchsorted(day_index[order], np.arange(len(days)))]
+
+    return DailyForecast(
+        days=days[:max_days],
+        temp_min=np.minimum.reduceat(cols.temp_min, starts)[:max_days],
+        temp_max=np.maximum.reduceat(cols.temp_max, starts)[:max_days],
+        temp_mean=temp_mean[:max_days],
+        humidity_mean=(np.add.reduceat(cols.humidity, starts) / counts)[:max_days],
+        wind_max=np.maximum.reduceat(cols.wind_speed, starts)[:max_days],
+        pop_max=np.maximum.reduceat(cols.pop, starts)[:max_days],
+        trend=trend[:max_days],
+        icon_codes=cols.icon_codes[noon_points][:max_days],
+        rolling_temp=rolling_mean(cols.temp),
+    )
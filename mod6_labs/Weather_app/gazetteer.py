@@ -0,0 +1,175 @@
+"""
+Offline city lookup backed by the OpenWeatherMap bulk city list.
+
+The list (``city.list.json.gz``, ~200k cities) can be downloaded from
+http://bulk.openweathermap.org/sample/ . It is loaded once into sorted
+parallel arrays: prefix search is two binary searches, and misspellings
+are matched with ``difflib`` against names that share the first letter.
+Every result carries the city ID, so lookups by ID never miss.
+"""
+import difflib
+import gzip
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from city_index import normalize_city
+from fast_json import loads
+
+
+def search_key(name: str) -> str:
+    """Normalized name with accents removed ("São Paulo" -> "sao paulo")."""
+    decomposed = unicodedata.normalize("NFKD", normalize_city(name))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+@dataclass(frozen=True)
+class CitySuggestion:
+    """One city from the list."""
+
+    __slots__ = ("id", "name", "state", "country", "lat", "lon")
+
+    id: int
+    name: str
+    state: str
+    country: str
+    lat: float
+    lon: float
+
+    @property
+    def label(self) -> str:
+        """Display text, e.g. 'Springfield, IL, US'."""
+        return ", ".join(part for part in (self.name, self.state, self.country) if part)
+
+
+class Gazetteer:
+    """Sorted, compact index of the city list with prefix and fuzzy search."""
+
+    def __init__(self, records: List[Tuple[str, int, str, str, str, float, float]]):
+        """
+        Args:
+            records: ``(key, id, name, state, country, lat, lon)`` tuples
+        """
+        records.sort()
+        self._keys: List[str] = [r[0] for r in records]
+        self._ids = array("q", (r[1] for r in records))
+        self._names: List[str] = [r[2] for r in records]
+        self._states: List[str] = [r[3] for r in records]
+        self._countries: List[str] = [r[4] for r in records]
+        self._lats = array("d", (r[5] for r in records))
+        self._lons = array("d", (r[6] for r in records))
+        self._by_id: Dict[int, int] = {city_id: i for i, city_id in enumerate(self._ids)}
+        # Distinct names, for fuzzy matching
+        self._unique_keys: List[str] = sorted(set(self._keys))
+
+    @classmethod
+    def load(cls, path: Path) -> "Gazetteer":
+        """Load ``city.list.json`` or ``city.list.json.gz``."""
+        path = Path(path)
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rb") as f:
+            cities = loads(f.read())
+
+        records = []
+        for city in cities:
+            name = city.get("name") or ""
+            if not name:
+                continue
+            coord = city.get("coord") or {}
+            records.append((
+                search_key(name),
+                int(city["id"]),
+                name,
+                city.get("state") or "",
+                city.get("country") or "",
+                float(coord.get("lat", 0.0)),
+                float(coord.get("lon", 0.0)),
+            ))
+        return cls(records)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _record(self, i: int) -> CitySuggestion:
+        return CitySuggestion(
+            self._ids[i], self._names[i], self._states[i],
+            self._countries[i], self._lats[i], self._lons[i],
+        )
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        """Index range of the keys starting with ``prefix``."""
+        return bisect_left(self._keys, prefix), bisect_left(self._keys, prefix + "\U0010ffff")
+
+    @staticmethod
+    def _parse(query: str) -> Tuple[str, List[str]]:
+        """Split 'Springfield, IL, US' into a name key and state/country qualifiers."""
+        name, *qualifiers = query.split(",")
+        return search_key(name), [q.strip().upper() for q in qualifiers if q.strip()]
+
+    def _matches(self, i: int, qualifiers: List[str]) -> bool:
+        return all(q in (self._countries[i], self._states[i].upper()) for q in qualifiers)
+
+    def get(self, city_id: int) -> Optional[CitySuggestion]:
+        """Return the city with the given ID."""
+        i = self._by_id.get(city_id)
+        return None if i is None else self._record(i)
+
+    def exact(self, query: str) -> List[CitySuggestion]:
+        """All cities whose name equals the query (accents and case ignored)."""
+        key, qualifiers = self._parse(query)
+        lo, hi = bisect_left(self._keys, key), bisect_right(self._keys, key)
+        return [self._record(i) for i in range(lo, hi) if self._matches(i, qualifiers)]
+
+    def resolve(self, query: str) -> Optional[CitySuggestion]:
+        """Return the city the query names, if it names exactly one."""
+        matches = self.exact(query)
+        return matches[0] if len(matches) == 1 else None
+
+    def suggest(self, query: str, limit: int = 8, fuzzy: bool = True) -> List[CitySuggestion]:
+        """
+        Cities for an as-you-type query.
+
+        Exact name matches come first, then other names starting with the
+        query (shortest first). If nothing starts with the query, close
+        misspellings are suggested instead.
+        """
+        key, qualifiers = self._parse(query)
+        if not key:
+            return []
+
+        lo, hi = self._range(key)
+        # Shorter names are the likelier completions ("paris" before "parisot")
+        candidates = sorted(range(lo, hi), key=lambda i: (len(self._keys[i]), self._keys[i]))
+        results: List[CitySuggestion] = []
+        seen = set()
+        for i in candidates:
+            if len(results) >= limit:
+                break
+            label = (self._keys[i], self._states[i], self._countries[i])
+            if label in seen or not self._matches(i, qualifiers):
+                continue
+            seen.add(label)
+            results.append(self._record(i))
+
+        if fuzzy and not results and len(key) >= 3:
+            for match in self.fuzzy(key, limit):
+                for city in self.exact(", ".join([match, *qualifiers])):
+                    label = (search_key(city.name), city.state, city.country)
+                    if label not in seen and len(results) < limit:
+                        seen.add(label)
+                        results.append(city)
+        return results
+
+    def fuzzy(self, key: str, limit: int = 5, cutoff: float = 0.75) -> List[str]:
+        """Names close to ``key``, compared against names with the same first letter."""
+        lo = bisect_left(self._unique_keys, key[0])
+        hi = bisect_left(self._unique_keys, key[0] + "\U0010ffff")
+        slack = max(2, len(key) // 4)
+        candidates = [
+            name for name in self._unique_keys[lo:hi]
+            if abs(len(name) - len(key)) <= slack and name != key
+        ]
+        return difflib.get_close_matches(key, candidates, n=limit, cutoff=cutoff)
@@ -0,0 +1,98 @@
+"""Local copies of the OpenWeatherMap condition icons."""
+import asyncio
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable, Optional, Set
+
+from config import Config
+from weather_service import WeatherServiceError
+
+# Every icon the API uses (clear, few/scattered/broken clouds, shower rain,
+# rain, thunderstorm, snow, mist), by day and by night
+ICON_CODES = tuple(
+    f"{number}{time_of_day}"
+    for number in ("01", "02", "03", "04", "09", "10", "11", "13", "50")
+    for time_of_day in ("d", "n")
+)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class IconCache:
+    """
+    Weather icons kept as files in the app's Flet assets folder.
+
+    ``src(code)`` returns the asset path of an icon that is on disk, so the
+    client loads it locally; an icon that is not there yet falls back to
+    its remote URL. ``prewarm()`` downloads the missing icons once, through
+    ``fetch`` (the WeatherService's pooled client), so after the first
+    start rendering weather needs no second network connection.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[bytes]],
+        directory: Path,
+        url: Optional[str] = None,
+    ):
+        """
+        Args:
+            fetch: Coroutine function returning the bytes at a URL
+            directory: Folder for the icons, ``icons`` inside the assets folder
+            url: Remote URL template with a ``{code}`` placeholder
+        """
+        self.fetch = fetch
+        self.directory = Path(directory)
+        self.url = url or Config.ICON_URL
+        self._on_disk: Set[str] = set()
+        if self.directory.is_dir():
+            self._on_disk.update(path.stem for path in self.directory.glob("*.png"))
+        self.downloaded = 0
+
+    def remote_url(self, code: str) -> str:
+        return self.url.format(code=code)
+
+    def src(self, code: str) -> str:
+        """Image source for an icon: the local asset if downloaded, else the remote URL."""
+        if code in self._on_disk:
+            return f"/{self.directory.name}/{code}.png"
+        return self.remote_url(code)
+
+    async def prewarm(self, codes: Iterable[str] = ICON_CODES) -> int:
+        """Download the icons that are not on disk yet; returns how many were saved."""
+        missing = [code for code in codes if code not in self._on_disk]
+        if not missing:
+            return 0
+        await asyncio.to_thread(self.directory.mkdir, parents=True, exist_ok=True)
+
+        semaphore = asyncio.Semaphore(Config.ICON_PREWARM_CONCURRENCY)
+        errors = []
+
+        async def download(code: str) -> bool:
+            async with semaphore:
+                try:
+                    data = await self.fetch(self.remote_url(code))
+                except WeatherServiceError as e:
+                    errors.append(e)
+                    return False
+            if not data.startswith(PNG_SIGNATURE):
+                errors.append(f"icon {code} is not a PNG")
+                return False
+            await asyncio.to_thread(self._write, code, data)
+            return True
+
+        saved = sum(await asyncio.gather(*(download(code) for code in missing)))
+        if errors:
+            # Retried on the next start
+            print(f"Could not download {len(errors)} weather icons: {errors[0]}")
+        return saved
+
+    def _write(self, code: str, data: bytes):
+        """Write an icon atomically so a half-written file is never served."""
+        path = self.directory / f"{code}.png"
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._on_disk.add(code)
+        self.downloaded += 1
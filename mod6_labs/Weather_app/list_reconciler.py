@@ -0,0 +1,80 @@
+"""Incremental rendering of keyed lists of rows into a Flet Column."""
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import flet as ft
+
+
+class KeyedListReconciler:
+    """
+    Keeps ``column.controls`` in sync with a list of ``(key, item)`` pairs.
+
+    Each key keeps its row control between renders: new keys get a row from
+    ``build_row(item)``, keys whose item changed are patched in place with
+    ``update_row(row, item)``, and keys that disappeared are dropped. Only
+    the column itself is updated, and Flet diffs its children by identity,
+    so a render sends the inserted, moved, removed or patched rows instead
+    of the whole list. Pass ``request_update`` to route that update
+    through an ``UpdateScheduler`` instead of sending it immediately.
+    """
+
+    def __init__(
+        self,
+        column: ft.Column,
+        build_row: Callable[[Any], ft.Control],
+        update_row: Callable[[ft.Control, Any], None],
+        request_update: Optional[Callable[[ft.Control], None]] = None,
+    ):
+        self.column = column
+        self.build_row = build_row
+        self.update_row = update_row
+        self.request_update = request_update
+        self._rows: Dict[Hashable, ft.Control] = {}
+        self._items: Dict[Hashable, Any] = {}
+        self.stats = {"renders": 0, "inserted": 0, "patched": 0, "removed": 0, "updates": 0}
+
+    def reconcile(self, items: Iterable[Tuple[Hashable, Any]]) -> bool:
+        """
+        Render ``items`` in order; returns whether anything changed.
+
+        The column is updated here when it is already on the page.
+        """
+        rows: Dict[Hashable, ft.Control] = {}
+        new_items: Dict[Hashable, Any] = {}
+        controls: List[ft.Control] = []
+        patched = inserted = 0
+
+        for key, item in items:
+            if key in rows:
+                continue
+            row = self._rows.get(key)
+            if row is None:
+                row = self.build_row(item)
+                inserted += 1
+            elif self._items[key] != item:
+                self.update_row(row, item)
+                patched += 1
+            rows[key] = row
+            new_items[key] = item
+            controls.append(row)
+
+        removed = sum(1 for key in self._rows if key not in rows)
+        reordered = len(controls) != len(self.column.controls) or any(
+            a is not b for a, b in zip(controls, self.column.controls)
+        )
+        self._rows, self._items = rows, new_items
+
+        self.stats["renders"] += 1
+        self.stats["inserted"] += inserted
+        self.stats["patched"] += patched
+        self.stats["removed"] += removed
+
+        if not (reordered or patched):
+            return False
+
+        self.column.controls = controls
+        if self.request_update is not None:
+            self.request_update(self.column)
+        elif self.column.page is not None:
+            self.column.update()
+        self.stats["updates"] += 1
+        return True
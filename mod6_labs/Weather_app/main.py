@@ -1,13 +1,27 @@
 """Weather Application using Flet v0.28.3 with Search History and Temperature Unit Toggle"""
 
+import time
+
+_STARTED = time.perf_counter()  # reference point for Config.STARTUP_PROBE
+
 import flet as ft
 from weather_service import WeatherService
+from weather_cache import ResponseCache, PersistentWeatherCache
+from storage import AppStore
+from city_index import CityIndex, normalize_city
+from list_reconciler import KeyedListReconciler
+from update_scheduler import UpdateScheduler
+from gazetteer import CitySuggestion, Gazetteer
+from auto_refresh import AutoRefreshScheduler
+from icon_cache import IconCache
 from config import Config
-import json
 from pathlib import Path
-from weather_service import WeatherServiceError
+from weather_service import CityNotFoundError, WeatherServiceError
+from models import WeatherSnapshot
 import asyncio
+import importlib
 from datetime import datetime
+from typing import List, Optional
 
 
 class WeatherApp:
@@ -15,18 +29,51 @@ class WeatherApp:
     
     def __init__(self, page: ft.Page):
         self.page = page
-        self.weather_service = WeatherService()
-        self.history_file = Path("search_history.json")
-        self.preferences_file = Path("user_preferences.json")
-        self.favorites_file = Path("favorite_cities.json")
-        self.search_history = self.load_history()
-        self.preferences = self.load_preferences()
-        self.favorite_cities = self.load_favorites()
-        self.use_fahrenheit = self.preferences.get('use_fahrenheit', False)
+        # Every UI change goes through here so bursts become one round trip
+        self.updates = UpdateScheduler(page)
+        self.weather_cache = PersistentWeatherCache(Path(Config.PERSISTENT_CACHE_FILE))
+        self.weather_service = WeatherService(cache=ResponseCache(backend=self.weather_cache))
+        # Condition icons are served from the assets folder once downloaded
+        self.icons = IconCache(
+            self.weather_service.fetch_asset,
+            Path(__file__).resolve().parent / Config.ASSETS_DIR / "icons",
+        )
+        # Opened by load_state once the first frame is on screen
+        self.store = AppStore(Path(Config.STATE_DB_FILE))
+        self.search_history = CityIndex()
+        self.preferences = {}
+        self.favorite_cities = CityIndex()
+        self.use_fahrenheit = False
         self.current_weather_data = None
         self.current_city_name = None
+        self.current_city_id = None
+        self.current_forecast = None
+        self._search_task = None
+        # Offline city list for suggestions; loaded in the background
+        self.gazetteer = None
+        # (label, city ID) of the suggestion or history entry being searched
+        self.selected_city = None
+        self._suggest_task = None
+        self.dashboard_cells = {}
+        self._dashboard_task = None
+        self.auto_refresh = AutoRefreshScheduler(self.auto_refresh_targets, self.auto_refresh_target)
         self.setup_page()
         self.build_ui()
+        if Config.STARTUP_PROBE:
+            print(f"First frame after {(time.perf_counter() - _STARTED) * 1000:.1f} ms", flush=True)
+        
+        # Saved state, the HTTP client and the city list load after the first frame
+        self.page.on_close = self.on_close
+        # The desktop client exits without sending that "close" event, so
+        # closing the window is held until pending state is saved
+        self.page.window.prevent_close = True
+        self.page.run_task(self.load_state)
+        self.page.run_task(self.load_gazetteer)
+        
+        # Keep the shown weather current; paused while the window is hidden
+        self.page.on_app_lifecycle_state_change = self.on_lifecycle_change
+        self.page.window.on_event = self.on_window_event
+        self._auto_refresh_run = self.page.run_task(self.auto_refresh.run)
 
     
     def setup_page(self):
@@ -47,6 +94,68 @@ class WeatherApp:
         self.page.window.center()
 
 
+    def read_state(self):
+        """Open the database and read history, favorites and preferences (worker thread)."""
+        # One-time import of the JSON files used by older versions
+        self.store.migrate_json(
+            Path("search_history.json"),
+            Path("favorite_cities.json"),
+            Path("user_preferences.json"),
+        )
+        # Last known weather, so restoring it needs no disk access on the event loop
+        self.weather_cache.open()
+        history = CityIndex((item['city'], item) for item in self.store.history())
+        favorites = CityIndex((city, city) for city in self.store.favorites())
+        return history, favorites, self.store.preferences()
+
+
+    async def load_state(self):
+        """Fill in the saved state, restore the last weather and warm up the HTTP client."""
+        (history, favorites, preferences), _ = await asyncio.gather(
+            asyncio.to_thread(self.read_state),
+            # numpy is only needed once a forecast arrives
+            asyncio.to_thread(importlib.import_module, "forecast_engine"),
+        )
+        
+        # Keep anything searched or starred while the database was loading
+        for item in reversed(list(self.search_history)):
+            history.push_front(item['city'], item)
+        for city in self.favorite_cities:
+            favorites.add(city, city)
+        self.search_history = history
+        self.favorite_cities = favorites
+        self.preferences = {**preferences, **self.preferences}
+        
+        use_fahrenheit = self.preferences.get('use_fahrenheit', False)
+        if use_fahrenheit != self.use_fahrenheit:
+            self.use_fahrenheit = use_fahrenheit
+            self.apply_temperature_unit()
+        if self.current_city_name:
+            self.update_city_actions(self.current_city_name)
+        self.update_history_display()
+        self.update_favorites_display()
+        self.updates.request()
+        
+        if self.current_weather_data is None:
+            await self.restore_last_weather()
+        await self.weather_service.start()
+        self.page.run_task(self.icons.prewarm)
+
+
+    async def on_close(self, e):
+        """Release the shared HTTP connection pool and save pending state on shutdown."""
+        self._auto_refresh_run.cancel()
+        await self.weather_service.aclose()
+        await asyncio.to_thread(self.weather_cache.close)
+        await asyncio.to_thread(self.store.close)
+
+
+    async def close_window(self):
+        """Save pending state, then let the window close."""
+        await self.on_close(None)
+        self.page.window.destroy()
+
+
     def get_weather_background_color(self, weather_id: int, icon_code: str) -> str:
         """Determine background color based on weather condition."""
         is_night = icon_code.endswith('n')
@@ -86,49 +195,9 @@ class WeatherApp:
         return ft.Colors.BLACK
 
 
-    def load_preferences(self):
-        """Load user preferences from file."""
-        if self.preferences_file.exists():
-            try:
-                with open(self.preferences_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-    
-    
-    def save_preferences(self):
-        """Save user preferences to file."""
-        try:
-            with open(self.preferences_file, 'w') as f:
-                json.dump(self.preferences, f, indent=2)
-        except Exception as e:
-            print(f"Error saving preferences: {e}")
-    
-    
-    def load_favorites(self):
-        """Load favorite cities from file."""
-        if self.favorites_file.exists():
-            try:
-                with open(self.favorites_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
-    
-    
-    def save_favorites(self):
-        """Save favorite cities to file."""
-        try:
-            with open(self.favorites_file, 'w') as f:
-                json.dump(self.favorite_cities, f, indent=2)
-        except Exception as e:
-            print(f"Error saving favorites: {e}")
-    
-    
     def is_favorite(self, city: str) -> bool:
         """Check if a city is in favorites."""
-        return any(fav.lower() == city.lower() for fav in self.favorite_cities)
+        return city in self.favorite_cities
     
     
     def toggle_favorite(self, e):
@@ -140,25 +209,26 @@ class WeatherApp:
         
         if self.is_favorite(city):
             # Remove from favorites
-            self.favorite_cities = [f for f in self.favorite_cities if f.lower() != city.lower()]
+            self.favorite_cities.remove(city)
+            self.store.remove_favorite(city)
             self.favorite_button.icon = ft.Icons.STAR_BORDER
             self.favorite_button.tooltip = "Add to favorites"
         else:
             # Add to favorites
-            self.favorite_cities.append(city)
+            self.favorite_cities.add(city, city)
+            self.store.add_favorite(city)
             self.favorite_button.icon = ft.Icons.STAR
             self.favorite_button.tooltip = "Remove from favorites"
         
-        self.save_favorites()
         self.update_favorites_display()
-        self.page.update()
+        self.updates.request(self.favorite_button)
     
     
-    def get_weather_tip(self, weather_data: dict) -> str:
+    def get_weather_tip(self, weather: WeatherSnapshot) -> str:
         """Get a helpful tip based on weather conditions."""
-        weather_id = weather_data.get("weather", [{}])[0].get("id", 800)
-        temp = weather_data.get("main", {}).get("temp", 0)
-        humidity = weather_data.get("main", {}).get("humidity", 0)
+        weather_id = weather.weather_id
+        temp = weather.temp
+        humidity = weather.humidity
         
         # Rain conditions
         if 300 <= weather_id < 600:
@@ -219,11 +289,19 @@ class WeatherApp:
 
     def toggle_temperature_unit(self, e):
         """Toggle between Celsius and Fahrenheit."""
-        self.use_fahrenheit = not self.use_fahrenheit
-        
-        self.preferences['use_fahrenheit'] = self.use_fahrenheit
-        self.save_preferences()
-        
+        with self.updates.action("toggle_unit"):
+            self.auto_refresh.touch()
+            self.use_fahrenheit = not self.use_fahrenheit
+            
+            self.preferences['use_fahrenheit'] = self.use_fahrenheit
+            self.store.set_preference('use_fahrenheit', self.use_fahrenheit)
+            
+            self.apply_temperature_unit()
+            self.updates.request()
+
+
+    def apply_temperature_unit(self):
+        """Show the current unit on the toggle and in every temperature."""
         if self.use_fahrenheit:
             self.temp_toggle.content.controls[0].value = "°F"
             self.temp_toggle.content.controls[0].color = ft.Colors.ORANGE_700
@@ -233,14 +311,7 @@ class WeatherApp:
             self.temp_toggle.content.controls[0].color = ft.Colors.BLUE_700
             self.temp_toggle.bgcolor = ft.Colors.BLUE_100
         
-        if self.current_weather_data and self.weather_container.visible:
-            # Schedule the async refresh
-            async def refresh():
-                await self.refresh_weather_display()
-            
-            self.page.run_task(refresh)
-        
-        self.page.update()
+        self.refresh_temperatures()
 
 
     def build_ui(self):
@@ -299,6 +370,7 @@ class WeatherApp:
             prefix_icon=ft.Icons.LOCATION_CITY,
             autofocus=True,
             on_submit=self.on_search,
+            on_change=self.on_city_input_change,
             expand=True,
         )
         
@@ -349,6 +421,20 @@ class WeatherApp:
             spacing=10,
         )
         
+        # As-you-type city suggestions
+        self.suggestions_list = ft.Column(spacing=0)
+        self.suggestion_rows = KeyedListReconciler(
+            self.suggestions_list, self.build_suggestion_row, self.patch_suggestion_row, self.updates.request
+        )
+        self.suggestions_container = ft.Container(
+            content=self.suggestions_list,
+            bgcolor=ft.Colors.WHITE,
+            border=ft.border.all(1, ft.Colors.BLUE_100),
+            border_radius=10,
+            padding=ft.padding.symmetric(vertical=4),
+            visible=False,
+        )
+        
         self.history_expanded = False
         self.expand_icon = ft.IconButton(
             icon=ft.Icons.EXPAND_MORE,
@@ -366,6 +452,15 @@ class WeatherApp:
             on_click=self.toggle_favorites,
         )
         
+        # Dashboard showing current weather for every favorite at once
+        self.dashboard_visible = False
+        self.dashboard_button = ft.IconButton(
+            icon=ft.Icons.DASHBOARD_OUTLINED,
+            tooltip="Show weather for all favorites",
+            icon_size=20,
+            on_click=self.toggle_dashboard,
+        )
+        
         self.favorites_header = ft.Container(
             content=ft.Row(
                 [
@@ -381,7 +476,13 @@ class WeatherApp:
                         ],
                         spacing=8,
                     ),
-                    self.favorites_expand_icon,
+                    ft.Row(
+                        [
+                            self.dashboard_button,
+                            self.favorites_expand_icon,
+                        ],
+                        spacing=0,
+                    ),
                 ],
                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
             ),
@@ -394,6 +495,9 @@ class WeatherApp:
         )
         
         self.favorites_list = ft.Column(spacing=8)
+        self.favorite_rows = KeyedListReconciler(
+            self.favorites_list, self.build_favorite_row, self.patch_favorite_row, self.updates.request
+        )
         
         self.favorites_dropdown = ft.Container(
             content=ft.Container(
@@ -411,6 +515,16 @@ class WeatherApp:
             opacity=0,
         )
         
+        self.dashboard_list = ft.Column(spacing=8)
+        
+        self.dashboard_container = ft.Container(
+            content=self.dashboard_list,
+            bgcolor=ft.Colors.with_opacity(0.05, ft.Colors.AMBER),
+            border_radius=10,
+            padding=15,
+            visible=False,
+        )
+        
         # Search History Section
         self.history_header = ft.Container(
             content=ft.Row(
@@ -451,6 +565,9 @@ class WeatherApp:
         )
         
         self.history_list = ft.Column(spacing=8)
+        self.history_rows = KeyedListReconciler(
+            self.history_list, self.build_history_row, self.patch_history_row, self.updates.request
+        )
         
         self.history_dropdown = ft.Container(
             content=ft.Container(
@@ -469,15 +586,61 @@ class WeatherApp:
         )
         
         self.weather_container = ft.Container(
+            content=self.build_weather_card(),
             visible=False,
             bgcolor=ft.Colors.with_opacity(0.05, ft.Colors.BLUE),
             border_radius=15,
             padding=30,
             animate=ft.Animation(500, ft.AnimationCurve.EASE_IN_OUT),
+            animate_opacity=300,
+        )
+        
+        # 5-day forecast panel
+        self.forecast_row = ft.Row(
+            alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            spacing=6,
+        )
+        self.forecast_days = []
+        
+        self.forecast_container = ft.Container(
+            content=ft.Column(
+                [
+                    ft.Row(
+                        [
+                            ft.Icon(ft.Icons.CALENDAR_MONTH, size=20, color=ft.Colors.BLUE_700),
+                            ft.Text(
+                                "5-Day Forecast",
+                                size=16,
+                                weight=ft.FontWeight.BOLD,
+                                color=ft.Colors.BLUE_700,
+                            ),
+                        ],
+                        spacing=8,
+                    ),
+                    self.forecast_row,
+                ],
+                spacing=10,
+            ),
+            visible=False,
+            bgcolor=ft.Colors.with_opacity(0.05, ft.Colors.BLUE),
+            border_radius=15,
+            padding=15,
         )
         
         # Weather tip container
+        self.weather_tip_text = ft.Text(
+            size=14,
+            color=ft.Colors.GREEN_900,
+            weight=ft.FontWeight.W_500,
+        )
         self.weather_tip = ft.Container(
+            content=ft.Row(
+                [
+                    ft.Icon(ft.Icons.TIPS_AND_UPDATES, size=20, color=ft.Colors.GREEN_700),
+                    self.weather_tip_text,
+                ],
+                spacing=10,
+            ),
             visible=False,
             bgcolor=ft.Colors.with_opacity(0.1, ft.Colors.GREEN),
             border_radius=10,
@@ -534,14 +697,17 @@ class WeatherApp:
                     title_row,
                     ft.Divider(height=20, color=ft.Colors.TRANSPARENT),
                     search_row,
+                    self.suggestions_container,
                     ft.Divider(height=10, color=ft.Colors.TRANSPARENT),
                     self.favorites_header,
                     self.favorites_dropdown,
+                    self.dashboard_container,
                     self.history_header,
                     self.history_dropdown,
                     self.loading,
                     self.error_message,
                     self.weather_container,
+                    self.forecast_container,
                     self.weather_tip,
                     self.info_message,
                 ],
@@ -562,42 +728,24 @@ class WeatherApp:
         else:
             self.page.theme_mode = ft.ThemeMode.LIGHT
             self.theme_button.icon = ft.Icons.DARK_MODE
-        self.page.update()
+        self.updates.request()
 
 
-    def load_history(self):
-        """Load search history from file."""
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
-    
-    
-    def save_history(self):
-        """Save search history to file."""
-        try:
-            with open(self.history_file, 'w') as f:
-                json.dump(self.search_history, f, indent=2)
-        except Exception as e:
-            print(f"Error saving history: {e}")
-    
-    
-    def add_to_history(self, city: str):
+    def add_to_history(self, city: str, city_id=None):
         """Add city to history."""
-        self.search_history = [item for item in self.search_history 
-                               if item.get('city', '').lower() != city.lower()]
+        previous = self.search_history.get(city)
         
-        self.search_history.insert(0, {
+        timestamp = datetime.now().isoformat()
+        self.search_history.push_front(city, {
             'city': city,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': timestamp,
+            'count': (previous or {}).get('count', 0) + 1,
+            # Like the database, keep a known ID when this search had none
+            'id': city_id or (previous or {}).get('id'),
         })
         
-        self.search_history = self.search_history[:10]
-        
-        self.save_history()
+        # Only this city's row changes in the database
+        self.store.record_search(city, timestamp, city_id)
         
         self.update_history_display()
     
@@ -615,7 +763,7 @@ class WeatherApp:
             self.history_dropdown.opacity = 0
             self.history_dropdown.visible = False
             
-        self.page.update()
+        self.updates.request()
     
     
     def toggle_favorites(self, e):
@@ -631,145 +779,294 @@ class WeatherApp:
             self.favorites_dropdown.opacity = 0
             self.favorites_dropdown.visible = False
             
-        self.page.update()
+        self.updates.request()
+    
+    
+    def format_history_time(self, item: dict) -> str:
+        """Format the 'last searched' line of a history row."""
+        try:
+            dt = datetime.fromisoformat(item.get('timestamp', ''))
+        except (TypeError, ValueError):
+            return ""
+        
+        time_str = dt.strftime("%b %d, %I:%M %p")
+        count = item.get('count', 1)
+        if count > 1:
+            time_str = f"{time_str} · {count} searches"
+        return time_str
+    
+    
+    def build_history_row(self, item: dict) -> ft.Container:
+        """Create the row control for a history entry."""
+        history_item = ft.Container(
+            content=ft.Row(
+                [
+                    ft.Icon(
+                        ft.Icons.LOCATION_ON,
+                        size=18,
+                        color=ft.Colors.BLUE_600,
+                    ),
+                    ft.Column(
+                        [
+                            ft.Text(
+                                size=15,
+                                weight=ft.FontWeight.W_500,
+                                color=ft.Colors.BLUE_900,
+                            ),
+                            ft.Text(
+                                size=12,
+                                color=ft.Colors.GREY_600,
+                            ),
+                        ],
+                        spacing=2,
+                        expand=True,
+                    ),
+                    ft.IconButton(
+                        icon=ft.Icons.CLOSE,
+                        icon_size=18,
+                        tooltip="Remove from history",
+                        on_click=self.on_remove_history_click,
+                    ),
+                ],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            ),
+            bgcolor=ft.Colors.WHITE,
+            border_radius=10,
+            padding=12,
+            on_click=self.on_saved_city_click,
+            ink=True,
+            animate=ft.Animation(200, ft.AnimationCurve.EASE_OUT),
+        )
+        self.patch_history_row(history_item, item)
+        return history_item
+    
+    
+    def patch_history_row(self, history_item: ft.Container, item: dict):
+        """Update an existing history row in place."""
+        city = item.get('city', '')
+        icon, texts, remove_button = history_item.content.controls
+        city_text, time_text = texts.controls
+        
+        city_text.value = city
+        time_text.value = self.format_history_time(item)
+        time_text.visible = bool(time_text.value)
+        
+        # Handlers read the city from the control, so rows can be reused
+        history_item.data = city
+        remove_button.data = city
+    
+    
+    def on_saved_city_click(self, e):
+        """Search the city of the clicked history or favorites row."""
+        self.search_from_history(e.control.data)
+    
+    
+    def on_remove_history_click(self, e):
+        """Remove the city of the clicked history row."""
+        self.remove_from_history(e.control.data)
     
     
     def update_history_display(self):
-        """Update the history display with current history."""
-        self.history_list.controls.clear()
+        """Sync the history rows with the current history, sending only what changed."""
+        self.history_rows.reconcile(
+            (normalize_city(item['city']), item)
+            for item in self.search_history.head(Config.HISTORY_DISPLAY_LIMIT)
+        )
         
-        if not self.search_history:
-            self.history_header.visible = False
-            self.history_dropdown.visible = False
-            self.page.update()
-            return
+        has_history = len(self.search_history) > 0
+        if self.history_header.visible != has_history:
+            self.history_header.visible = has_history
+            if not has_history:
+                self.history_dropdown.visible = False
+            self.updates.request(self.history_header, self.history_dropdown)
+    
+    
+    def toggle_dashboard(self, e):
+        """Show or hide the weather dashboard for all favorite cities."""
+        self.auto_refresh.touch()
+        self.dashboard_visible = not self.dashboard_visible
+        self.dashboard_container.visible = self.dashboard_visible
+        
+        if self.dashboard_visible:
+            self.dashboard_button.icon = ft.Icons.DASHBOARD
+        else:
+            self.dashboard_button.icon = ft.Icons.DASHBOARD_OUTLINED
+        self.reload_dashboard()
         
-        self.history_header.visible = True
+        self.updates.request()
+    
+    
+    def reload_dashboard(self):
+        """Rebuild the dashboard rows if it is open, cancelling a load still in progress."""
+        if self._dashboard_task is not None:
+            self._dashboard_task.cancel()
+            self._dashboard_task = None
+        if self.dashboard_visible:
+            self._dashboard_task = self.page.run_task(self.load_favorites_dashboard)
+    
+    
+    async def load_favorites_dashboard(self):
+        """Fetch all favorites in parallel and fill in each row as it arrives."""
+        self.dashboard_list.controls.clear()
+        self.dashboard_cells = {}
         
-        for item in self.search_history:
-            city = item.get('city', '')
-            timestamp = item.get('timestamp', '')
-            
-            try:
-                dt = datetime.fromisoformat(timestamp)
-                time_str = dt.strftime("%b %d, %I:%M %p")
-            except:
-                time_str = ""
-            
-            history_item = ft.Container(
-                content=ft.Row(
-                    [
-                        ft.Icon(
-                            ft.Icons.LOCATION_ON,
-                            size=18,
-                            color=ft.Colors.BLUE_600,
-                        ),
-                        ft.Column(
-                            [
-                                ft.Text(
-                                    city,
-                                    size=15,
-                                    weight=ft.FontWeight.W_500,
-                                    color=ft.Colors.BLUE_900,
-                                ),
-                                ft.Text(
-                                    time_str,
-                                    size=12,
-                                    color=ft.Colors.GREY_600,
-                                ) if time_str else ft.Container(),
-                            ],
-                            spacing=2,
-                            expand=True,
-                        ),
-                        ft.IconButton(
-                            icon=ft.Icons.CLOSE,
-                            icon_size=18,
-                            tooltip="Remove from history",
-                            on_click=lambda e, c=city: self.remove_from_history(c),
-                        ),
-                    ],
-                    alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                ),
-                bgcolor=ft.Colors.WHITE,
-                border_radius=10,
-                padding=12,
-                on_click=lambda e, c=city: self.search_from_history(c),
-                ink=True,
-                animate=ft.Animation(200, ft.AnimationCurve.EASE_OUT),
+        for city in self.favorite_cities:
+            status = ft.Row(
+                [ft.ProgressRing(width=16, height=16, stroke_width=2)],
+                spacing=8,
             )
+            self.dashboard_cells[city] = status
             
-            self.history_list.controls.append(history_item)
+            self.dashboard_list.controls.append(
+                ft.Container(
+                    content=ft.Row(
+                        [
+                            ft.Text(
+                                city,
+                                size=15,
+                                weight=ft.FontWeight.W_500,
+                                color=ft.Colors.AMBER_900,
+                                expand=True,
+                            ),
+                            status,
+                        ],
+                        alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                    ),
+                    bgcolor=ft.Colors.AMBER_50,
+                    border_radius=10,
+                    padding=12,
+                    on_click=lambda e, c=city: self.search_from_history(c),
+                    ink=True,
+                )
+            )
+        self.updates.request()
         
-        self.page.update()
+        # Rows fill in as results stream back instead of waiting for the slowest city
+        async for city, data, error in self.weather_service.iter_weather_many(list(self.favorite_cities)):
+            if not self.dashboard_visible:
+                break
+            
+            status = self.dashboard_cells.get(city)
+            if status is None:
+                continue
+            self.render_dashboard_status(status, data, error)
+            self.updates.request()
     
     
-    def update_favorites_display(self):
-        """Update the favorites display with current favorites."""
-        self.favorites_list.controls.clear()
-        
-        if not self.favorite_cities:
-            self.favorites_header.visible = False
-            self.favorites_dropdown.visible = False
-            self.page.update()
-            return
-        
-        self.favorites_header.visible = True
-        
-        for city in self.favorite_cities:
-            favorite_item = ft.Container(
-                content=ft.Row(
-                    [
-                        ft.Icon(
-                            ft.Icons.STAR,
-                            size=18,
-                            color=ft.Colors.AMBER_600,
-                        ),
-                        ft.Text(
-                            city,
-                            size=15,
-                            weight=ft.FontWeight.W_500,
-                            color=ft.Colors.AMBER_900,
-                            expand=True,
-                        ),
-                        ft.IconButton(
-                            icon=ft.Icons.CLOSE,
-                            icon_size=18,
-                            tooltip="Remove from favorites",
-                            on_click=lambda e, c=city: self.remove_from_favorites(c),
-                        ),
-                    ],
-                    alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+    def render_dashboard_status(self, status: ft.Row, data, error):
+        """Show a favorite's weather (or its error) in its dashboard row."""
+        if error is not None:
+            status.controls = [
+                ft.Icon(ft.Icons.ERROR_OUTLINE, size=18, color=ft.Colors.RED_400),
+                ft.Text("Unavailable", size=13, color=ft.Colors.RED_400),
+            ]
+            status.data = None
+        else:
+            status.controls = [
+                ft.Image(
+                    src=self.icons.src(data.icon_code),
+                    width=32,
+                    height=32,
                 ),
-                bgcolor=ft.Colors.AMBER_50,
-                border_radius=10,
-                padding=12,
-                on_click=lambda e, c=city: self.search_from_history(c),
-                ink=True,
-                animate=ft.Animation(200, ft.AnimationCurve.EASE_OUT),
-            )
-            
-            self.favorites_list.controls.append(favorite_item)
+                ft.Text(
+                    self.get_temp_display(data.temp),
+                    size=15,
+                    weight=ft.FontWeight.BOLD,
+                    color=ft.Colors.AMBER_900,
+                ),
+            ]
+            # Observation time, to skip re-rendering unchanged data
+            status.data = data.dt
+    
+    
+    def build_favorite_row(self, city: str) -> ft.Container:
+        """Create the row control for a favorite city."""
+        favorite_item = ft.Container(
+            content=ft.Row(
+                [
+                    ft.Icon(
+                        ft.Icons.STAR,
+                        size=18,
+                        color=ft.Colors.AMBER_600,
+                    ),
+                    ft.Text(
+                        size=15,
+                        weight=ft.FontWeight.W_500,
+                        color=ft.Colors.AMBER_900,
+                        expand=True,
+                    ),
+                    ft.IconButton(
+                        icon=ft.Icons.CLOSE,
+                        icon_size=18,
+                        tooltip="Remove from favorites",
+                        on_click=self.on_remove_favorite_click,
+                    ),
+                ],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            ),
+            bgcolor=ft.Colors.AMBER_50,
+            border_radius=10,
+            padding=12,
+            on_click=self.on_saved_city_click,
+            ink=True,
+            animate=ft.Animation(200, ft.AnimationCurve.EASE_OUT),
+        )
+        self.patch_favorite_row(favorite_item, city)
+        return favorite_item
+    
+    
+    def patch_favorite_row(self, favorite_item: ft.Container, city: str):
+        """Update an existing favorite row in place."""
+        icon, city_text, remove_button = favorite_item.content.controls
+        city_text.value = city
+        favorite_item.data = city
+        remove_button.data = city
+    
+    
+    def on_remove_favorite_click(self, e):
+        """Remove the city of the clicked favorites row."""
+        self.remove_from_favorites(e.control.data)
+    
+    
+    def update_favorites_display(self):
+        """Sync the favorites rows with the current favorites, sending only what changed."""
+        self.favorite_rows.reconcile(
+            (normalize_city(city), city) for city in self.favorite_cities
+        )
         
-        self.page.update()
+        has_favorites = len(self.favorite_cities) > 0
+        if self.favorites_header.visible != has_favorites:
+            self.favorites_header.visible = has_favorites
+            if not has_favorites:
+                self.favorites_dropdown.visible = False
+                self.dashboard_visible = False
+                self.dashboard_container.visible = False
+            self.updates.request(self.favorites_header, self.favorites_dropdown, self.dashboard_container)
+        # Open dashboards get a row for every favorite, and none for removed ones
+        self.reload_dashboard()
     
     
     def remove_from_favorites(self, city: str):
         """Remove a city from favorites."""
-        self.favorite_cities = [f for f in self.favorite_cities if f.lower() != city.lower()]
-        self.save_favorites()
+        self.favorite_cities.remove(city)
+        self.store.remove_favorite(city)
         self.update_favorites_display()
         
         # Update favorite button if this is the current city
-        if self.current_city_name and self.current_city_name.lower() == city.lower():
+        if self.current_city_name and normalize_city(self.current_city_name) == normalize_city(city):
             self.favorite_button.icon = ft.Icons.STAR_BORDER
             self.favorite_button.tooltip = "Add to favorites"
-            self.page.update()
+            self.updates.request(self.favorite_button)
     
     
     def search_from_history(self, city: str):
         """Search weather for a city from history."""
         self.city_input.value = city
-        self.page.update()
+        item = self.search_history.get(city)
+        if item and item.get('id'):
+            # Search the exact city that was found last time
+            self.selected_city = (city, item['id'])
+        self.updates.request()
         
         # Schedule the async task
         async def search():
@@ -780,16 +1077,15 @@ class WeatherApp:
     
     def remove_from_history(self, city: str):
         """Remove a city from search history."""
-        self.search_history = [item for item in self.search_history 
-                               if item.get('city', '').lower() != city.lower()]
-        self.save_history()
+        self.search_history.remove(city)
+        self.store.remove_history(city)
         self.update_history_display()
     
     
     def clear_history(self, e):
         """Clear all search history."""
-        self.search_history = []
-        self.save_history()
+        self.search_history.clear()
+        self.store.clear_history()
         self.update_history_display()
     
     
@@ -806,26 +1102,131 @@ class WeatherApp:
         """Handle refresh button click."""
         # Re-fetch weather for the last searched city
         if self.current_weather_data:
-            last_city = self.current_weather_data.get("name", "")
+            last_city = self.current_weather_data.city_name
             if last_city:
                 self.city_input.value = last_city
-                self.page.update()
+                if self.current_city_id:
+                    self.selected_city = (last_city, self.current_city_id)
+                self.updates.request()
                 
                 # Show refreshing indicator
                 self.refresh_button.icon = ft.Icons.HOURGLASS_BOTTOM
                 self.refresh_button.disabled = True
-                self.page.update()
+                self.updates.request()
                 
                 async def refresh():
-                    await self.get_weather()
-                    # Reset refresh button
-                    self.refresh_button.icon = ft.Icons.REFRESH
-                    self.refresh_button.disabled = False
-                    self.page.update()
+                    try:
+                        await self.get_weather()
+                    finally:
+                        # Reset refresh button, even if a newer search replaced this one
+                        self.refresh_button.icon = ft.Icons.REFRESH
+                        self.refresh_button.disabled = False
+                        self.updates.request()
                 
                 self.page.run_task(refresh)
 
 
+    async def load_gazetteer(self):
+        """Load the offline city list for suggestions, if it has been downloaded."""
+        path = Path(Config.CITY_LIST_FILE)
+        if not path.exists():
+            return
+        try:
+            self.gazetteer = await asyncio.to_thread(Gazetteer.load, path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Error loading city list {path}: {e}")
+    
+    
+    def resolve_city_id(self, query: str):
+        """City ID for a query: the picked suggestion, or the only city with that exact name."""
+        if self.selected_city is not None and self.selected_city[0] == query:
+            return self.selected_city[1]
+        if self.gazetteer is None:
+            return None
+        match = self.gazetteer.resolve(query)
+        return match.id if match else None
+    
+    
+    async def find_close_cities(self, query: str) -> List[CitySuggestion]:
+        """Suggestions for a name the API didn't find and the city list doesn't contain (likely a typo)."""
+        if self.gazetteer is None or self.gazetteer.exact(query):
+            return []
+        return await asyncio.to_thread(self.gazetteer.suggest, query, Config.SUGGESTION_LIMIT)
+    
+    
+    def on_city_input_change(self, e):
+        """Update the suggestions once the user pauses typing."""
+        self.auto_refresh.touch()
+        self.page.run_task(self.update_suggestions, self.city_input.value or "")
+    
+    
+    async def update_suggestions(self, text: str):
+        """Debounced, cancellable lookup of suggestions for the typed text."""
+        # Each keystroke replaces the previous lookup
+        current_task = asyncio.current_task()
+        if self._suggest_task not in (None, current_task) and not self._suggest_task.done():
+            self._suggest_task.cancel()
+        self._suggest_task = current_task
+        
+        if self.selected_city is not None and text.strip() != self.selected_city[0]:
+            self.selected_city = None
+        
+        await asyncio.sleep(Config.SUGGEST_DEBOUNCE)
+        
+        query = text.strip()
+        if self.gazetteer is None or len(query) < 2 or self.selected_city is not None:
+            suggestions = []
+        else:
+            suggestions = await asyncio.to_thread(self.gazetteer.suggest, query, Config.SUGGESTION_LIMIT)
+        
+        if self._suggest_task is current_task:
+            self._suggest_task = None
+            self.show_suggestions(suggestions)
+    
+    
+    def build_suggestion_row(self, city: CitySuggestion) -> ft.ListTile:
+        """Create the row control for a city suggestion."""
+        tile = ft.ListTile(
+            leading=ft.Icon(ft.Icons.LOCATION_CITY, color=ft.Colors.BLUE_400),
+            title=ft.Text(size=14),
+            dense=True,
+            on_click=self.on_suggestion_click,
+        )
+        self.patch_suggestion_row(tile, city)
+        return tile
+    
+    
+    def patch_suggestion_row(self, tile: ft.ListTile, city: CitySuggestion):
+        """Update an existing suggestion row in place."""
+        tile.title.value = city.label
+        tile.data = city
+    
+    
+    def show_suggestions(self, cities: List[CitySuggestion]):
+        """Show the given suggestions under the search field (none hides the list)."""
+        self.suggestion_rows.reconcile((city.id, city) for city in cities)
+        if self.suggestions_container.visible != bool(cities):
+            self.suggestions_container.visible = bool(cities)
+            self.updates.request(self.suggestions_container)
+    
+    
+    def hide_suggestions(self):
+        """Hide the suggestions and drop a lookup that is still pending."""
+        if self._suggest_task is not None and not self._suggest_task.done():
+            self._suggest_task.cancel()
+        self._suggest_task = None
+        self.show_suggestions([])
+    
+    
+    def on_suggestion_click(self, e):
+        """Search the exact city that was picked."""
+        city = e.control.data
+        self.selected_city = (city.label, city.id)
+        self.city_input.value = city.label
+        self.updates.request(self.city_input)
+        self.page.run_task(self.get_weather)
+    
+    
     async def get_weather(self):
         """Fetch and display weather data."""
         city = self.city_input.value.strip()
@@ -834,33 +1235,61 @@ class WeatherApp:
             self.show_error("Please enter a city name")
             return
         
+        # Cancel a search that is still running for a previous city so only
+        # the latest result is rendered
+        current_task = asyncio.current_task()
+        if self._search_task not in (None, current_task) and not self._search_task.done():
+            self._search_task.cancel()
+        self._search_task = current_task
+        self.updates.start_action("search")
+        self.auto_refresh.touch()
+        self.hide_suggestions()
+        
         self.loading.visible = True
         self.error_message.visible = False
-        self.weather_container.visible = False
-        self.page.update()
+        # Fade the previous card out instead of hiding it, so showing the new
+        # one takes a single update
+        self.weather_container.opacity = 0
+        self.forecast_container.visible = False
+        self.updates.request()
         
         try:
-            weather_data = await self.weather_service.get_weather(city)
+            # The local list only speeds lookups up; the API decides what exists
+            city_id = self.resolve_city_id(city)
             
-            self.current_weather_data = weather_data
+            # Fetch the forecast alongside the weather so both land in the same frame
+            if city_id is not None:
+                forecast_prefetch = asyncio.ensure_future(self.weather_service.get_forecast_by_id(city_id))
+            else:
+                forecast_prefetch = asyncio.ensure_future(self.weather_service.get_forecast(city))
+            forecast_prefetch.add_done_callback(lambda task: task.cancelled() or task.exception())
             
-            actual_city_name = weather_data.get("name", city)
-            self.add_to_history(actual_city_name)
+            if city_id is not None:
+                weather_data = await self.weather_service.get_weather_by_id(city_id)
+            else:
+                weather_data = await self.weather_service.get_weather(city)
             
-            # Show refresh button after successful search
-            self.refresh_button.visible = True
+            self.current_weather_data = weather_data
+            self.current_city_id = city_id
             
-            # Show and update favorite button
-            self.favorite_button.visible = True
-            self.current_city_name = actual_city_name
-            if self.is_favorite(actual_city_name):
-                self.favorite_button.icon = ft.Icons.STAR
-                self.favorite_button.tooltip = "Remove from favorites"
-            else:
-                self.favorite_button.icon = ft.Icons.STAR_BORDER
-                self.favorite_button.tooltip = "Add to favorites"
+            actual_city_name = weather_data.city_name
+            self.add_to_history(actual_city_name, city_id)
+            
+            self.update_city_actions(actual_city_name)
             
             await self.display_weather(weather_data)
+            # Use the prefetch even when the API names the city differently
+            # from what was typed, instead of asking for the forecast again
+            await self.load_forecast(actual_city_name, city_id, prefetch=forecast_prefetch)
+        
+        except CityNotFoundError as e:
+            # Offer close names from the city list only once the API has no match
+            close_matches = await self.find_close_cities(city) if city_id is None else []
+            if close_matches:
+                self.show_error(f"City '{city}' not found. Did you mean {close_matches[0].label}?")
+                self.show_suggestions(close_matches)
+            else:
+                self.show_error(str(e))
         
         except WeatherServiceError as e:
             self.show_error(str(e))
@@ -869,102 +1298,185 @@ class WeatherApp:
             self.show_error(str(e))
         
         finally:
-            self.loading.visible = False
-            self.page.update()
+            if self._search_task is current_task:
+                self._search_task = None
+                self.loading.visible = False
+                self.updates.request()
+                self.updates.end_action()
     
     
-    async def refresh_weather_display(self):
-        """Refresh weather display with current temperature unit."""
-        if self.current_weather_data:
-            await self.display_weather(self.current_weather_data)
+    def update_city_actions(self, city_name: str):
+        """Show the refresh and favorite buttons for the displayed city."""
+        # Show refresh button after successful search
+        self.refresh_button.visible = True
+        
+        # Show and update favorite button
+        self.favorite_button.visible = True
+        self.current_city_name = city_name
+        if self.is_favorite(city_name):
+            self.favorite_button.icon = ft.Icons.STAR
+            self.favorite_button.tooltip = "Remove from favorites"
+        else:
+            self.favorite_button.icon = ft.Icons.STAR_BORDER
+            self.favorite_button.tooltip = "Add to favorites"
     
     
-    async def display_weather(self, data: dict):
-        """Display weather information."""
-        self.info_message.visible = False
+    def auto_refresh_targets(self):
+        """What the background refresh updates: the shown city, then each favorite."""
+        targets = []
+        if self.current_weather_data is not None:
+            targets.append(None)
+        current = normalize_city(self.current_city_name or "")
+        targets.extend(city for city in self.favorite_cities if normalize_city(city) != current)
+        return targets
+    
+    
+    async def auto_refresh_target(self, city):
+        """Refresh one target (None is the displayed city) and re-render only if it changed."""
+        if city is None:
+            await self.refresh_current_weather()
+            return
         
-        city_name = data.get("name", "Unknown")
-        country = data.get("sys", {}).get("country", "")
-        temp = data.get("main", {}).get("temp", 0)
-        temp_max = data.get("main", {}).get("temp_max", 0)
-        temp_min = data.get("main", {}).get("temp_min", 0)
-        feels_like = data.get("main", {}).get("feels_like", 0)
-        humidity = data.get("main", {}).get("humidity", 0)
-        pressure = data.get("main", {}).get("pressure", 0)
-        description = data.get("weather", [{}])[0].get("description", "").title()
-        icon_code = data.get("weather", [{}])[0].get("icon", "01d")
-        wind_speed = data.get("wind", {}).get("speed", 0)
-        cloudiness = data.get("clouds", {}).get("all", 0)
-        weather_id = data.get("weather", [{}])[0].get("id", 800)
-        
-        bg_color = self.get_weather_background_color(weather_id, icon_code)
-        text_color = self.get_text_color_for_background(bg_color)
+        data = await self.weather_service.get_weather(
+            city, allow_stale=False, max_age=Config.AUTO_REFRESH_MAX_AGE
+        )
+        status = self.dashboard_cells.get(city)
+        if self.dashboard_visible and status is not None and status.data != data.dt:
+            self.render_dashboard_status(status, data, None)
+            self.updates.request(status)
+    
+    
+    async def refresh_current_weather(self):
+        """Fetch the displayed city again and show it if there is a newer observation."""
+        current = self.current_weather_data
+        if current is None or self._search_task is not None:
+            # A search is running and will show fresh data anyway
+            return
         
-        self.weather_container.bgcolor = bg_color
-        self.weather_container.content = ft.Column(
+        city_id = self.current_city_id
+        if city_id:
+            data = await self.weather_service.get_weather_by_id(
+                city_id, allow_stale=False, max_age=Config.AUTO_REFRESH_MAX_AGE
+            )
+        else:
+            data = await self.weather_service.get_weather(
+                current.city_name, allow_stale=False, max_age=Config.AUTO_REFRESH_MAX_AGE
+            )
+        
+        if self.current_weather_data is not current or data.dt == current.dt:
+            return
+        
+        self.current_weather_data = data
+        await self.display_weather(data)
+        await self.load_forecast(data.city_name, city_id)
+    
+    
+    def on_lifecycle_change(self, e):
+        """Pause the background refresh while the app is hidden."""
+        if e.state in (ft.AppLifecycleState.HIDE, ft.AppLifecycleState.PAUSE, ft.AppLifecycleState.DETACH):
+            self.auto_refresh.pause()
+        elif e.state in (ft.AppLifecycleState.SHOW, ft.AppLifecycleState.RESUME, ft.AppLifecycleState.RESTART):
+            self.auto_refresh.resume()
+    
+    
+    def on_window_event(self, e):
+        """Pause the background refresh while the window is minimized or hidden, save on close."""
+        if e.type == ft.WindowEventType.CLOSE:
+            self.page.run_task(self.close_window)
+        elif e.type in (ft.WindowEventType.MINIMIZE, ft.WindowEventType.HIDE):
+            self.auto_refresh.pause()
+        elif e.type in (ft.WindowEventType.RESTORE, ft.WindowEventType.SHOW, ft.WindowEventType.FOCUS):
+            self.auto_refresh.resume()
+    
+    
+    async def restore_last_weather(self):
+        """Show the last known weather for the latest search, then refresh it."""
+        if not self.search_history:
+            return
+        
+        last_search = self.search_history.first()
+        city = last_search.get('city', '')
+        city_id = last_search.get('id')
+        if city_id:
+            cached = self.weather_service.get_cached_weather_by_id(city_id)
+        else:
+            cached = self.weather_service.get_cached_weather(city) if city else None
+        if not cached:
+            return
+        
+        self.current_weather_data = cached
+        self.current_city_id = city_id
+        self.city_input.value = city
+        self.update_city_actions(cached.city_name)
+        await self.display_weather(cached)
+        await self.load_forecast(cached.city_name, city_id)
+        
+        # Only goes to the network if the saved copy is out of date
+        try:
+            if city_id:
+                weather_data = await self.weather_service.get_weather_by_id(city_id, allow_stale=False)
+            else:
+                weather_data = await self.weather_service.get_weather(city, allow_stale=False)
+        except WeatherServiceError as e:
+            print(f"Error refreshing last known weather: {e}")
+            return
+        
+        if weather_data is not cached and self.current_weather_data is cached:
+            self.current_weather_data = weather_data
+            await self.display_weather(weather_data)
+    
+    
+    def refresh_temperatures(self):
+        """Re-render only the temperature texts after the unit changed."""
+        if self.current_weather_data:
+            self.update_card_temperatures(self.current_weather_data)
+        if self.current_forecast is not None:
+            self.display_forecast()
+    
+    
+    def build_weather_card(self) -> ft.Column:
+        """Build the weather card controls once; display_weather fills them in."""
+        self.card_location_icon = ft.Icon(ft.Icons.LOCATION_ON, size=24)
+        self.card_city_text = ft.Text(size=24, weight=ft.FontWeight.BOLD)
+        self.card_icon_image = ft.Image(width=100, height=100)
+        self.card_description_text = ft.Text(size=20, italic=True)
+        self.card_temp_text = ft.Text(size=56, weight=ft.FontWeight.BOLD)
+        self.card_feels_like_text = ft.Text(size=16)
+        self.card_temp_max_text = ft.Text(size=14)
+        self.card_temp_min_text = ft.Text(size=14)
+        self.card_divider = ft.Divider(height=20, thickness=1)
+        self.info_cards = {
+            'humidity': self.create_info_card(ft.Icons.WATER_DROP, "Humidity", ""),
+            'wind_speed': self.create_info_card(ft.Icons.AIR, "Wind Speed", ""),
+            'pressure': self.create_info_card(ft.Icons.COMPRESS, "Pressure", ""),
+            'cloudiness': self.create_info_card(ft.Icons.CLOUD, "Cloudiness", ""),
+        }
+        
+        return ft.Column(
             [
                 ft.Row(
-                    [
-                        ft.Icon(ft.Icons.LOCATION_ON, size=24, color=text_color),
-                        ft.Text(
-                            f"{city_name}, {country}",
-                            size=24,
-                            weight=ft.FontWeight.BOLD,
-                            color=text_color,
-                        ),
-                    ],
+                    [self.card_location_icon, self.card_city_text],
                     alignment=ft.MainAxisAlignment.CENTER,
                 ),
                 
                 ft.Divider(height=10, color=ft.Colors.TRANSPARENT),
                 
                 ft.Row(
-                    [
-                        ft.Image(
-                            src=f"https://openweathermap.org/img/wn/{icon_code}@2x.png",
-                            width=100,
-                            height=100,
-                        ),
-                    ],
+                    [self.card_icon_image],
                     alignment=ft.MainAxisAlignment.CENTER,
                 ),
                 
-                ft.Text(
-                    description,
-                    size=20,
-                    italic=True,
-                    color=text_color,
-                ),
+                self.card_description_text,
                 
                 ft.Divider(height=10, color=ft.Colors.TRANSPARENT),
                 
-                ft.Text(
-                    self.get_temp_display(temp),
-                    size=56,
-                    weight=ft.FontWeight.BOLD,
-                    color=text_color,
-                ),
+                self.card_temp_text,
                 
                 ft.Column(
                     [
-                        ft.Text(
-                            f"Feels like {self.get_temp_display(feels_like)}",
-                            size=16,
-                            color=text_color,
-                        ),
+                        self.card_feels_like_text,
                         ft.Row(
-                            [
-                                ft.Text(
-                                    f"↑ {self.get_temp_display(temp_max)}",
-                                    size=14,
-                                    color=ft.Colors.RED_300 if bg_color in [ft.Colors.INDIGO_900, ft.Colors.GREY_800, ft.Colors.BLUE_700] else ft.Colors.RED_600,
-                                ),
-                                ft.Text(
-                                    f"↓ {self.get_temp_display(temp_min)}",
-                                    size=14,
-                                    color=ft.Colors.LIGHT_BLUE_200 if bg_color in [ft.Colors.INDIGO_900, ft.Colors.GREY_800, ft.Colors.BLUE_700] else ft.Colors.BLUE_600,
-                                ),
-                            ],
+                            [self.card_temp_max_text, self.card_temp_min_text],
                             alignment=ft.MainAxisAlignment.CENTER,
                             spacing=20,
                         ),
@@ -973,27 +1485,10 @@ class WeatherApp:
                     spacing=5,
                 ),
                 
-                ft.Divider(
-                    height=20,
-                    color=ft.Colors.with_opacity(0.3, text_color),
-                    thickness=1
-                ),
+                self.card_divider,
                 
                 ft.Row(
-                    [
-                        self.create_info_card(
-                            ft.Icons.WATER_DROP,
-                            "Humidity",
-                            f"{humidity}%",
-                            text_color
-                        ),
-                        self.create_info_card(
-                            ft.Icons.AIR,
-                            "Wind Speed",
-                            f"{wind_speed} m/s",
-                            text_color
-                        ),
-                    ],
+                    [self.info_cards['humidity'], self.info_cards['wind_speed']],
                     alignment=ft.MainAxisAlignment.CENTER,
                     spacing=15,
                 ),
@@ -1001,20 +1496,7 @@ class WeatherApp:
                 ft.Divider(height=10, color=ft.Colors.TRANSPARENT),
                 
                 ft.Row(
-                    [
-                        self.create_info_card(
-                            ft.Icons.COMPRESS,
-                            "Pressure",
-                            f"{pressure} hPa",
-                            text_color
-                        ),
-                        self.create_info_card(
-                            ft.Icons.CLOUD,
-                            "Cloudiness",
-                            f"{cloudiness}%",
-                            text_color
-                        ),
-                    ],
+                    [self.info_cards['pressure'], self.info_cards['cloudiness']],
                     alignment=ft.MainAxisAlignment.CENTER,
                     spacing=15,
                 ),
@@ -1022,34 +1504,133 @@ class WeatherApp:
             horizontal_alignment=ft.CrossAxisAlignment.CENTER,
             spacing=5,
         )
+    
+    
+    def update_card_temperatures(self, data: WeatherSnapshot):
+        """Set the temperature texts of the weather card in the current unit."""
+        self.card_temp_text.value = self.get_temp_display(data.temp)
+        self.card_feels_like_text.value = f"Feels like {self.get_temp_display(data.feels_like)}"
+        self.card_temp_max_text.value = f"↑ {self.get_temp_display(data.temp_max)}"
+        self.card_temp_min_text.value = f"↓ {self.get_temp_display(data.temp_min)}"
+    
+    
+    async def display_weather(self, data: WeatherSnapshot):
+        """Display weather information."""
+        self.info_message.visible = False
+        
+        bg_color = self.get_weather_background_color(data.weather_id, data.icon_code)
+        text_color = self.get_text_color_for_background(bg_color)
+        dark_background = text_color == ft.Colors.WHITE
+        
+        # Only properties change, so the client receives a small diff
+        self.weather_container.bgcolor = bg_color
+        self.card_location_icon.color = text_color
+        self.card_city_text.value = f"{data.city_name}, {data.country}"
+        self.card_city_text.color = text_color
+        self.card_icon_image.src = self.icons.src(data.icon_code)
+        self.card_description_text.value = data.description
+        self.card_description_text.color = text_color
+        self.card_temp_text.color = text_color
+        self.card_feels_like_text.color = text_color
+        self.card_temp_max_text.color = ft.Colors.RED_300 if dark_background else ft.Colors.RED_600
+        self.card_temp_min_text.color = ft.Colors.LIGHT_BLUE_200 if dark_background else ft.Colors.BLUE_600
+        self.update_card_temperatures(data)
+        self.card_divider.color = ft.Colors.with_opacity(0.3, text_color)
+        
+        self.update_info_card(self.info_cards['humidity'], f"{data.humidity}%", text_color)
+        self.update_info_card(self.info_cards['wind_speed'], f"{data.wind_speed} m/s", text_color)
+        self.update_info_card(self.info_cards['pressure'], f"{data.pressure} hPa", text_color)
+        self.update_info_card(self.info_cards['cloudiness'], f"{data.cloudiness}%", text_color)
         
-        self.weather_container.animate_opacity = 300
-        self.weather_container.opacity = 0
-        self.weather_container.visible = True
-        self.page.update()
-
-        await asyncio.sleep(0.1)
-        self.weather_container.opacity = 1
-        self.page.update()
-
         self.error_message.visible = False
         
         # Show weather tip
-        tip_text = self.get_weather_tip(data)
-        self.weather_tip.content = ft.Row(
-            [
-                ft.Icon(ft.Icons.TIPS_AND_UPDATES, size=20, color=ft.Colors.GREEN_700),
-                ft.Text(
-                    tip_text,
-                    size=14,
-                    color=ft.Colors.GREEN_900,
-                    weight=ft.FontWeight.W_500,
-                ),
-            ],
-            spacing=10,
-        )
+        self.weather_tip_text.value = self.get_weather_tip(data)
         self.weather_tip.visible = True
-        self.page.update()
+        
+        if not self.weather_container.visible:
+            # A hidden card needs one frame at opacity 0 for the fade-in to run
+            self.weather_container.opacity = 0
+            self.weather_container.visible = True
+            self.updates.request()
+            await asyncio.sleep(0.1)
+        
+        self.weather_container.opacity = 1
+        self.updates.request()
+    
+    
+    async def load_forecast(self, city: str, city_id=None, prefetch: Optional[asyncio.Future] = None):
+        """Fetch the forecast for a city (or await one already requested) and show its daily summary."""
+        try:
+            if prefetch is not None:
+                series = await prefetch
+            elif city_id is not None:
+                series = await self.weather_service.get_forecast_by_id(city_id)
+            else:
+                series = await self.weather_service.get_forecast(city)
+        except WeatherServiceError as e:
+            print(f"Error loading forecast: {e}")
+            self.current_forecast = None
+            self.forecast_container.visible = False
+            self.updates.request()
+            return
+        
+        from forecast_engine import summarize_daily
+        
+        self.current_forecast = summarize_daily(series)
+        self.display_forecast()
+        self.updates.request()
+    
+    
+    def display_forecast(self):
+        """Render the daily forecast cards in the current temperature unit."""
+        from forecast_engine import celsius_to_fahrenheit
+        
+        daily = self.current_forecast
+        
+        # Convert every day in one go instead of per card
+        temp_max = daily.temp_max
+        temp_min = daily.temp_min
+        if self.use_fahrenheit:
+            temp_max = celsius_to_fahrenheit(temp_max)
+            temp_min = celsius_to_fahrenheit(temp_min)
+        unit = self.get_temp_unit_symbol()
+        
+        # Day cards are reused, so a re-render only changes their texts
+        while len(self.forecast_days) < len(daily):
+            self.forecast_days.append(self.build_forecast_day())
+        
+        for card, day_name, icon_code, high, low in zip(
+            self.forecast_days, daily.day_names(), daily.icon_codes, temp_max, temp_min
+        ):
+            name_text, image, high_text, low_text = card.content.controls
+            name_text.value = day_name
+            image.src = self.icons.src(icon_code)
+            high_text.value = f"{high:.0f}{unit}"
+            low_text.value = f"{low:.0f}{unit}"
+        
+        self.forecast_row.controls = self.forecast_days[:len(daily)]
+        self.forecast_container.visible = len(daily) > 0
+    
+    
+    def build_forecast_day(self) -> ft.Container:
+        """Create one day card of the forecast panel."""
+        return ft.Container(
+            content=ft.Column(
+                [
+                    ft.Text(size=13, weight=ft.FontWeight.BOLD),
+                    ft.Image(width=40, height=40),
+                    ft.Text(size=13, color=ft.Colors.RED_600),
+                    ft.Text(size=12, color=ft.Colors.BLUE_600),
+                ],
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                spacing=2,
+            ),
+            bgcolor=ft.Colors.WHITE,
+            border_radius=10,
+            padding=8,
+            expand=True,
+        )
     
     
     def create_info_card(self, icon, label, value, text_color=ft.Colors.BLUE_900):
@@ -1079,19 +1660,31 @@ class WeatherApp:
         )
     
     
+    def update_info_card(self, card: ft.Container, value: str, text_color=ft.Colors.BLUE_900):
+        """Update the value and colors of an info card in place."""
+        icon, label, value_text = card.content.controls
+        icon.color = text_color
+        label.color = text_color
+        value_text.value = value
+        value_text.color = text_color
+        card.bgcolor = ft.Colors.with_opacity(0.2, ft.Colors.WHITE) if text_color == ft.Colors.WHITE else ft.Colors.WHITE
+    
+    
     def show_error(self, message: str):
         """Display error message."""
         self.error_message.value = f"❌ {message}"
         self.error_message.visible = True
         self.weather_container.visible = False
+        self.forecast_container.visible = False
         self.info_message.visible = False
-        self.page.update()
+        self.updates.request()
 
 
 def main(page: ft.Page):
     """Main entry point."""
+    Config.validate()
     WeatherApp(page)
 
 
 if __name__ == "__main__":
-    ft.app(target=main)
\ No newline at end of file
+    ft.app(target=main, assets_dir=Config.ASSETS_DIR)
\ No newline at end of file
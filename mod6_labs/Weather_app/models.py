@@ -0,0 +1,144 @@
+"""Compact weather data models parsed from OpenWeatherMap responses."""
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class WeatherSnapshot:
+    """Current conditions for one city, holding only the fields the UI uses."""
+
+    __slots__ = (
+        "city_name",
+        "country",
+        "dt",
+        "temp",
+        "feels_like",
+        "temp_min",
+        "temp_max",
+        "humidity",
+        "pressure",
+        "wind_speed",
+        "cloudiness",
+        "weather_id",
+        "icon_code",
+        "description",
+    )
+
+    city_name: str
+    country: str
+    dt: int  # time the data was calculated (unix, UTC)
+    temp: float
+    feels_like: float
+    temp_min: float
+    temp_max: float
+    humidity: int
+    pressure: int
+    wind_speed: float
+    cloudiness: int
+    weather_id: int
+    icon_code: str
+    description: str
+
+    @classmethod
+    def from_api(cls, data: Dict) -> "WeatherSnapshot":
+        """Parse a /weather response."""
+        main = data.get("main", {})
+        weather = (data.get("weather") or [{}])[0]
+        return cls(
+            city_name=data.get("name", "Unknown"),
+            country=data.get("sys", {}).get("country", ""),
+            dt=data.get("dt", 0),
+            temp=main.get("temp", 0),
+            feels_like=main.get("feels_like", 0),
+            temp_min=main.get("temp_min", 0),
+            temp_max=main.get("temp_max", 0),
+            humidity=main.get("humidity", 0),
+            pressure=main.get("pressure", 0),
+            wind_speed=data.get("wind", {}).get("speed", 0),
+            cloudiness=data.get("clouds", {}).get("all", 0),
+            weather_id=weather.get("id", 800),
+            icon_code=weather.get("icon", "01d"),
+            description=weather.get("description", "").title(),
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> Optional["WeatherSnapshot"]:
+        """Rebuild a snapshot saved with ``to_dict()`` (None if it doesn't fit)."""
+        try:
+            return cls(**data)
+        except TypeError:
+            return None
+
+    def to_dict(self) -> Dict:
+        """Return the fields as a plain dictionary (for JSON storage)."""
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class ForecastPoint:
+    """One 3-hour step of the 5-day forecast."""
+
+    __slots__ = (
+        "dt",
+        "temp",
+        "temp_min",
+        "temp_max",
+        "humidity",
+        "wind_speed",
+        "pop",
+        "weather_id",
+        "icon_code",
+        "description",
+    )
+
+    dt: int
+    temp: float
+    temp_min: float
+    temp_max: float
+    humidity: int
+    wind_speed: float
+    pop: float  # probability of precipitation, 0-1
+    weather_id: int
+    icon_code: str
+    description: str
+
+    @classmethod
+    def from_api(cls, item: Dict) -> "ForecastPoint":
+        """Parse one entry of the /forecast ``list``."""
+        main = item.get("main", {})
+        weather = (item.get("weather") or [{}])[0]
+        return cls(
+            dt=item.get("dt", 0),
+            temp=main.get("temp", 0),
+            temp_min=main.get("temp_min", 0),
+            temp_max=main.get("temp_max", 0),
+            humidity=main.get("humidity", 0),
+            wind_speed=item.get("wind", {}).get("speed", 0),
+            pop=item.get("pop", 0),
+            weather_id=weather.get("id", 800),
+            icon_code=weather.get("icon", "01d"),
+            description=weather.get("description", "").title(),
+        )
+
+
+@dataclass(frozen=True)
+class ForecastSeries:
+    """The 5-day / 3-hour forecast for one city."""
+
+    __slots__ = ("city_name", "country", "timezone", "points")
+
+    city_name: str
+    country: str
+    timezone: int  # shift from UTC in seconds
+    points: Tuple[ForecastPoint, ...]
+
+    @classmethod
+    def from_api(cls, data: Dict) -> "ForecastSeries":
+        """Parse a /forecast response."""
+        city = data.get("city", {})
+        return cls(
+            city_name=city.get("name", "Unknown"),
+            country=city.get("country", ""),
+            timezone=city.get("timezone", 0),
+            points=tuple(ForecastPoint.from_api(item) for item in data.get("list", [])),
+        )
@@ -0,0 +1,134 @@
+"""Rate limiting, retry backoff and circuit breaking for API calls."""
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from config import Config
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Each request takes one token; when none are left the caller sleeps
+    until its token would have refilled. Reservations are made under a
+    thread lock so one bucket can be shared by every service instance.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.throttled = 0
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it."""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            self.throttled += 1
+            return -self._tokens / self.rate
+
+    async def acquire(self) -> float:
+        """Wait for a token. Returns the time spent waiting."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+# One bucket for the whole process so several open pages can't together
+# exceed the free-tier quota
+shared_rate_limiter = TokenBucket(
+    rate=Config.RATE_LIMIT_PER_MINUTE / 60,
+    capacity=Config.RATE_LIMIT_BURST,
+)
+
+
+class CircuitBreaker:
+    """
+    Stop calling an upstream that keeps failing.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    requests are refused for ``reset_timeout`` seconds. Then one trial
+    request is let through (half-open): success closes the circuit, failure
+    opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        clock=time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold or Config.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or Config.CIRCUIT_RESET_TIMEOUT
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent right now."""
+        if self.state == self.CLOSED:
+            return True
+        # Open: wait out the timeout. Half-open: only one trial at a time,
+        # unless the trial never reported back (e.g. it was cancelled)
+        if self.clock() - self.opened_at < self.reset_timeout:
+            return False
+        self.state = self.HALF_OPEN
+        self.opened_at = self.clock()
+        return True
+
+    def record_success(self):
+        """Close the circuit after a healthy response."""
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        """Count a failure, opening the circuit once the threshold is hit."""
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+
+
+def backoff_delay(attempt: int, base: Optional[float] = None, cap: Optional[float] = None) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (0-based)."""
+    base = Config.RETRY_BASE_DELAY if base is None else base
+    cap = Config.RETRY_MAX_DELAY if cap is None else cap
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,315 @@
+"""SQLite store for the app's search history, favorites and preferences."""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from city_index import normalize_city
+from config import Config
+
+SCHEMA_VERSION = 1
+
+_FLUSH = object()
+_STOP = object()
+
+
+def load_json(path: Path, default: Any) -> Any:
+    """
+    Load a JSON file, returning ``default`` if it is missing.
+
+    An unreadable file is renamed to ``*.corrupt`` instead of being
+    silently overwritten by the next save.
+    """
+    path = Path(path)
+    if not path.exists():
+        return default
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading {path}: {e}")
+        try:
+            os.replace(path, path.with_name(path.name + ".corrupt"))
+        except OSError:
+            pass
+        return default
+
+
+class AppStore:
+    """
+    One WAL-mode SQLite database for all local app state.
+
+    * ``history`` has one row per city (keyed by ``normalize_city``) with
+      its display name, last search time and search count; every search is
+      also logged with its timestamp in ``search_log``, without a cap.
+    * ``favorites`` keeps the favorite cities in the order they were added.
+    * ``preferences`` holds JSON-encoded values by key.
+
+    Reads happen on the caller's thread. Changes are single-row upserts and
+    deletes queued to a writer thread, which commits everything queued
+    within ``batch_delay`` seconds in one transaction. ``flush()`` waits for
+    pending writes (call it on shutdown).
+
+    The database is opened on first use, so creating a store costs nothing
+    and the first read can happen off the UI thread.
+    """
+
+    def __init__(self, path: Optional[Path] = None, batch_delay: Optional[float] = None):
+        self.path = Path(path or Config.STATE_DB_FILE)
+        self.batch_delay = Config.SAVE_DEBOUNCE if batch_delay is None else batch_delay
+        self._conn: Optional[sqlite3.Connection] = None
+        self._open_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self.transactions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        # Readers never wait for the writer thread, and commits skip the extra fsync
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Return the read connection, opening the database on first use."""
+        with self._open_lock:
+            if self._conn is None:
+                conn = self._connect()
+                self._create_schema(conn)
+                self._conn = conn
+            return self._conn
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS history (
+                city_key TEXT PRIMARY KEY,
+                city TEXT NOT NULL,
+                last_searched TEXT NOT NULL,
+                search_count INTEGER NOT NULL DEFAULT 1,
+                city_id INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_history_last_searched ON history (last_searched);
+            CREATE TABLE IF NOT EXISTS search_log (
+                id INTEGER PRIMARY KEY,
+                city_key TEXT NOT NULL,
+                searched_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_search_log_city ON search_log (city_key, searched_at);
+            CREATE TABLE IF NOT EXISTS favorites (
+                city_key TEXT PRIMARY KEY,
+                city TEXT NOT NULL,
+                added_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS preferences (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        # Databases created before city IDs were stored
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(history)")}
+        if "city_id" not in columns:
+            conn.execute("ALTER TABLE history ADD COLUMN city_id INTEGER")
+        conn.commit()
+
+    # Reads
+
+    def history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return history rows, most recent first, as ``{'city', 'timestamp', 'count', 'id'}``."""
+        rows = self._reader().execute(
+            "SELECT city, last_searched, search_count, city_id FROM history "
+            "ORDER BY last_searched DESC LIMIT ?",
+            (-1 if limit is None else limit,),
+        ).fetchall()
+        return [
+            {"city": city, "timestamp": ts, "count": count, "id": city_id}
+            for city, ts, count, city_id in rows
+        ]
+
+    def search_times(self, city: str) -> List[str]:
+        """Return every recorded search time for a city, oldest first."""
+        rows = self._reader().execute(
+            "SELECT searched_at FROM search_log WHERE city_key = ? ORDER BY searched_at",
+            (normalize_city(city),),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def favorites(self) -> List[str]:
+        """Return favorite city names in the order they were added."""
+        rows = self._reader().execute("SELECT city FROM favorites ORDER BY added_at, rowid").fetchall()
+        return [row[0] for row in rows]
+
+    def preferences(self) -> Dict[str, Any]:
+        """Return all preferences."""
+        rows = self._reader().execute("SELECT key, value FROM preferences").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    # Writes
+
+    def record_search(self, city: str, timestamp: str, city_id: Optional[int] = None):
+        """Log a search and bump the city's count and last search time."""
+        key = normalize_city(city)
+        self._enqueue(
+            """
+            INSERT INTO history (city_key, city, last_searched, search_count, city_id)
+            VALUES (?, ?, ?, 1, ?)
+            ON CONFLICT (city_key) DO UPDATE SET
+                city = excluded.city,
+                last_searched = excluded.last_searched,
+                search_count = search_count + 1,
+                city_id = COALESCE(excluded.city_id, history.city_id)
+            """,
+            (key, city, timestamp, city_id),
+        )
+        self._enqueue("INSERT INTO search_log (city_key, searched_at) VALUES (?, ?)", (key, timestamp))
+
+    def remove_history(self, city: str):
+        """Forget all searches for a city."""
+        key = normalize_city(city)
+        self._enqueue("DELETE FROM history WHERE city_key = ?", (key,))
+        self._enqueue("DELETE FROM search_log WHERE city_key = ?", (key,))
+
+    def clear_history(self):
+        """Forget all searches."""
+        self._enqueue("DELETE FROM history", ())
+        self._enqueue("DELETE FROM search_log", ())
+
+    def add_favorite(self, city: str):
+        """Add a city to the end of the favorites."""
+        self._enqueue(
+            "INSERT OR IGNORE INTO favorites (city_key, city, added_at) VALUES (?, ?, ?)",
+            (normalize_city(city), city, time.time()),
+        )
+
+    def remove_favorite(self, city: str):
+        """Remove a city from the favorites."""
+        self._enqueue("DELETE FROM favorites WHERE city_key = ?", (normalize_city(city),))
+
+    def set_preference(self, key: str, value: Any):
+        """Insert or replace one preference."""
+        self._enqueue(
+            "INSERT OR REPLACE INTO preferences (key, value) VALUES (?, ?)",
+            (key, json.dumps(value)),
+        )
+
+    def _enqueue(self, sql: str, params: Tuple):
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run_writer, name="AppStoreWriter", daemon=True)
+            self._writer.start()
+        self._queue.put((sql, params))
+
+    def _run_writer(self):
+        """Commit queued statements in batches until ``close()``."""
+        # The schema must exist before the first batch
+        self._reader()
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_delay
+            # Collect whatever else arrives before the deadline (or a flush)
+            while batch[-1] is not _FLUSH and batch[-1] is not _STOP:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            stopping = batch[-1] is _STOP
+            statements = [item for item in batch if item is not _FLUSH and item is not _STOP]
+            if statements:
+                try:
+                    with conn:
+                        for sql, params in statements:
+                            conn.execute(sql, params)
+                    self.transactions += 1
+                except sqlite3.Error as e:
+                    print(f"Error saving app state: {e}")
+            for _ in batch:
+                self._queue.task_done()
+        conn.close()
+
+    def flush(self):
+        """Block until every queued change is committed."""
+        if self._writer is not None:
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self):
+        """Commit pending changes and close the database."""
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # Migration
+
+    def migrate_json(self, history_file: Path, favorites_file: Path, preferences_file: Path):
+        """
+        Import the JSON files used by older versions, once.
+
+        Runs only while the database is at schema version 0. Imported files
+        are renamed to ``*.migrated`` so they are kept but no longer read.
+        """
+        conn = self._reader()
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+
+        history = load_json(history_file, [])
+        favorites = load_json(favorites_file, [])
+        preferences = load_json(preferences_file, {})
+
+        with conn:
+            # Oldest first so later entries win for the display name
+            for item in reversed(history if isinstance(history, list) else []):
+                city = item.get("city", "") if isinstance(item, dict) else ""
+                if not city.strip():
+                    continue
+                timestamp = item.get("timestamp") or ""
+                key = normalize_city(city)
+                conn.execute(
+                    """
+                    INSERT INTO history (city_key, city, last_searched, search_count) VALUES (?, ?, ?, 1)
+                    ON CONFLICT (city_key) DO UPDATE SET
+                        city = excluded.city,
+                        last_searched = max(last_searched, excluded.last_searched),
+                        search_count = search_count + 1
+                    """,
+                    (key, city, timestamp),
+                )
+                conn.execute(
+                    "INSERT INTO search_log (city_key, searched_at) VALUES (?, ?)", (key, timestamp)
+                )
+
+            now = time.time()
+            for position, city in enumerate(favorites if isinstance(favorites, list) else []):
+                if isinstance(city, str) and city.strip():
+                    conn.execute(
+                        "INSERT OR IGNORE INTO favorites (city_key, city, added_at) VALUES (?, ?, ?)",
+                        (normalize_city(city), city, now + position * 1e-6),
+                    )
+
+            for key, value in (preferences.items() if isinstance(preferences, dict) else []):
+                conn.execute(
+                    "INSERT OR REPLACE INTO preferences (key, value) VALUES (?, ?)",
+                    (key, json.dumps(value)),
+                )
+
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        for path in (history_file, favorites_file, preferences_file):
+            path = Path(path)
+            if path.exists():
+                try:
+                    os.replace(path, path.with_name(path.name + ".migrated"))
+                except OSError as e:
+                    print(f"Error renaming {path}: {e}")
@@ -0,0 +1,123 @@
+"""Coalesces page updates into at most one client round trip per frame."""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import flet as ft
+
+from config import Config
+
+
+class UpdateScheduler:
+    """
+    Collects controls that need updating and sends them together.
+
+    ``request(*controls)`` marks controls dirty (no controls means the whole
+    page) and returns at once; it is safe to call from Flet's handler
+    threads. The dirty set is flushed with a single ``page.update()`` on the
+    event loop's next tick, and no more than ``max_fps`` times per second,
+    so a burst of changes during one action becomes one round trip.
+
+    ``start_action(name)`` begins counting the updates sent for a user
+    action and ``end_action()`` stops once the action's pending changes
+    are flushed (or use ``with scheduler.action(name):``);
+    ``action_updates`` holds the latest count for each action name.
+    """
+
+    def __init__(self, page: ft.Page, max_fps: Optional[float] = None):
+        self.page = page
+        max_fps = Config.UI_MAX_FPS if max_fps is None else max_fps
+        self.min_interval = 1 / max_fps if max_fps else 0.0
+        self._lock = threading.Lock()
+        self._dirty: Dict[int, ft.Control] = {}
+        self._whole_page = False
+        self._scheduled = False
+        self._last_flush = 0.0
+        self.requests = 0
+        self.updates_sent = 0
+        self.current_action: Optional[str] = None
+        self._end_action_after_flush = False
+        self.action_updates: Dict[str, int] = {}
+
+    def request(self, *controls: ft.Control):
+        """Mark controls (or the whole page) for the next flush."""
+        with self._lock:
+            self.requests += 1
+            if controls:
+                for control in controls:
+                    self._dirty[id(control)] = control
+            else:
+                self._whole_page = True
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.page.loop.call_soon_threadsafe(self._schedule_flush)
+
+    def start_action(self, name: str):
+        """Start counting the updates sent on behalf of a user action."""
+        with self._lock:
+            self.current_action = name
+            self._end_action_after_flush = False
+            self.action_updates[name] = 0
+    
+    def end_action(self):
+        """Stop counting for the current action after its pending flush."""
+        with self._lock:
+            if self._scheduled:
+                self._end_action_after_flush = True
+            else:
+                self.current_action = None
+    
+    @contextmanager
+    def action(self, name: str) -> Iterator[None]:
+        """Count the updates sent while the block runs, plus its final flush."""
+        self.start_action(name)
+        try:
+            yield
+        finally:
+            self.end_action()
+
+    def _schedule_flush(self):
+        delay = self._last_flush + self.min_interval - time.monotonic()
+        if delay > 0:
+            self.page.loop.call_later(delay, self.flush)
+        else:
+            self.page.loop.call_soon(self.flush)
+
+    def flush(self):
+        """Send everything marked dirty in one ``page.update()``."""
+        with self._lock:
+            dirty, self._dirty = list(self._dirty.values()), {}
+            whole_page, self._whole_page = self._whole_page, False
+            self._scheduled = False
+            action = self.current_action
+            if self._end_action_after_flush:
+                self.current_action = None
+                self._end_action_after_flush = False
+            if not (dirty or whole_page):
+                return
+            self._last_flush = time.monotonic()
+            self.updates_sent += 1
+            if action is not None:
+                self.action_updates[action] += 1
+
+        try:
+            if whole_page:
+                self.page.update()
+            else:
+                # Controls that were never added to the page have nothing to diff
+                mounted = [control for control in dirty if control.page is not None]
+                if mounted:
+                    self.page.update(*mounted)
+        except Exception as e:
+            print(f"Error updating page: {e}")
+
+    def stats(self) -> Dict[str, object]:
+        """Return request/update counters and the per-action counts."""
+        return {
+            "requests": self.requests,
+            "updates_sent": self.updates_sent,
+            "current_action": self.current_action,
+            "action_updates": dict(self.action_updates),
+        }
@@ -0,0 +1,360 @@
+"""Response cache for the weather service."""
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from config import Config
+from models import WeatherSnapshot
+
+_FLUSH = object()
+_STOP = object()
+
+
+def normalize_query(value: str) -> str:
+    """Normalize a city query so 'new  york' and 'New York' share a cache key."""
+    return " ".join(value.split()).casefold()
+
+
+class CacheEntry:
+    """A cached payload together with its freshness deadlines."""
+
+    __slots__ = ("value", "fetched_at", "expires_at", "stale_until")
+
+    def __init__(self, value: Any, fetched_at: float, expires_at: float, stale_until: float):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache of API responses with per-endpoint TTLs.
+
+    Entries are fresh until their endpoint TTL runs out. After that they
+    are "stale" for ``stale_ttl`` more seconds, during which the service
+    may return them instantly while it re-fetches in the background
+    (stale-while-revalidate). Anything older is treated as a miss.
+
+    Any object with the same ``lookup``/``peek``/``store``/``stats``
+    methods can be passed to ``WeatherService(cache=...)`` instead;
+    ``peek`` serves the last known data when the API is down.
+
+    An optional ``backend`` (see ``PersistentWeatherCache``) is consulted on
+    a miss and written through on every store, so entries survive restarts.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: Optional[int] = None,
+        stale_ttl: Optional[float] = None,
+        backend: Optional["PersistentWeatherCache"] = None,
+        clock=time.time,
+    ):
+        self.ttls = dict(Config.CACHE_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries or Config.CACHE_MAX_ENTRIES
+        self.stale_ttl = Config.CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        self.backend = backend
+        self.clock = clock
+        self._entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(endpoint: str, units: str, **query) -> Tuple:
+        """Build a normalized cache key for an endpoint and its query."""
+        parts = []
+        for name in sorted(query):
+            value = query[name]
+            if isinstance(value, str):
+                value = normalize_query(value)
+            elif isinstance(value, float):
+                # ~1 km precision so nearby coordinates share an entry
+                value = round(value, 2)
+            parts.append((name, value))
+        return (endpoint, units, tuple(parts))
+
+    def lookup(self, key: Tuple) -> Tuple[Optional[Any], bool]:
+        """
+        Look up a cached payload.
+
+        Returns:
+            ``(value, is_stale)``; value is None on a miss
+        """
+        entry = self._get_entry(key)
+        now = self.clock()
+
+        # Too-old entries stay around (until evicted) as a last resort for
+        # peek() when the API is down
+        if entry is None or now >= entry.stale_until:
+            self.misses += 1
+            return None, False
+
+        self._entries.move_to_end(key)
+        if now < entry.expires_at:
+            self.hits += 1
+            return entry.value, False
+
+        self.stale_hits += 1
+        return entry.value, True
+
+    def peek(self, key: Tuple) -> Tuple[Optional[Any], Optional[float]]:
+        """
+        Return the last known payload however old it is, without counting
+        a hit or miss.
+
+        Returns:
+            ``(value, fetched_at)``; both None if nothing was ever stored
+        """
+        entry = self._get_entry(key)
+        if entry is None:
+            return None, None
+        return entry.value, entry.fetched_at
+
+    def _get_entry(self, key: Tuple) -> Optional[CacheEntry]:
+        """Find an entry in memory, falling back to the persistent backend."""
+        entry = self._entries.get(key)
+        if entry is None and self.backend is not None:
+            value, fetched_at = self.backend.load(key)
+            if value is not None:
+                entry = self._put(key, value, fetched_at)
+        return entry
+
+    def store(self, key: Tuple, value: Any, fetched_at: Optional[float] = None):
+        """Store a payload, evicting the least recently used entries if full."""
+        fetched_at = self.clock() if fetched_at is None else fetched_at
+        self._put(key, value, fetched_at)
+        if self.backend is not None:
+            self.backend.save(key, value, fetched_at)
+
+    def _put(self, key: Tuple, value: Any, fetched_at: float) -> CacheEntry:
+        """Insert an entry into the in-memory LRU."""
+        endpoint = key[0]
+        expires_at = fetched_at + self.ttls.get(endpoint, 0)
+        entry = CacheEntry(value, fetched_at, expires_at, expires_at + self.stale_ttl)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def invalidate(self, key: Tuple):
+        """Drop a single entry."""
+        self._entries.pop(key, None)
+        if self.backend is not None:
+            self.backend.delete(key)
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class PersistentWeatherCache:
+    """
+    SQLite-backed store for the last ``WeatherSnapshot`` of each query.
+
+    Used as a ``ResponseCache`` backend so the app can show the last known
+    weather right after launch. ``open()`` reads the stored rows into
+    memory (call it off the event loop; the first ``load()`` does it
+    otherwise), so lookups never touch the disk. Saves and deletes are
+    queued to a writer thread that commits them in WAL mode and compacts
+    the table to the ``max_entries`` most recently fetched rows.
+    ``close()`` waits for pending writes (call it on shutdown).
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_entries: Optional[int] = None,
+        endpoints: Tuple[str, ...] = ("weather",),
+        compact_every: int = 20,
+    ):
+        self.path = Path(path or Config.PERSISTENT_CACHE_FILE)
+        self.max_entries = max_entries or Config.PERSISTENT_CACHE_MAX_ENTRIES
+        self.endpoints = endpoints
+        self.compact_every = compact_every
+        self._rows: Dict[str, Tuple[str, float]] = {}
+        self._rows_lock = threading.Lock()
+        self._opened = False
+        self._open_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writes_since_compact = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        # Must be set before the first table exists to take effect
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        # Commits skip the extra fsync; a crash loses at most the last few saves
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def open(self):
+        """Create the table on first use, trim it and read its rows into memory."""
+        with self._open_lock:
+            if self._opened:
+                return
+            self._opened = True
+            try:
+                conn = self._connect()
+                try:
+                    conn.execute(
+                        """
+                        CREATE TABLE IF NOT EXISTS responses (
+                            key TEXT PRIMARY KEY,
+                            payload TEXT NOT NULL,
+                            fetched_at REAL NOT NULL
+                        )
+                        """
+                    )
+                    conn.execute(
+                        "CREATE INDEX IF NOT EXISTS idx_responses_fetched_at ON responses (fetched_at)"
+                    )
+                    conn.commit()
+                    # Trim whatever the previous session left behind
+                    self._compact(conn)
+                    rows = conn.execute("SELECT key, payload, fetched_at FROM responses").fetchall()
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print(f"Error reading weather cache: {e}")
+                return
+            with self._rows_lock:
+                for key, payload, fetched_at in rows:
+                    # A save made while the rows were being read is newer
+                    self._rows.setdefault(key, (payload, fetched_at))
+
+    @staticmethod
+    def _encode_key(key: Tuple) -> str:
+        return json.dumps(key, separators=(",", ":"))
+
+    def load(self, key: Tuple) -> Tuple[Optional[WeatherSnapshot], Optional[float]]:
+        """Return ``(snapshot, fetched_at)`` for a key, or ``(None, None)``."""
+        if key[0] not in self.endpoints:
+            return None, None
+        self.open()
+        with self._rows_lock:
+            row = self._rows.get(self._encode_key(key))
+        if row is None:
+            return None, None
+        snapshot = WeatherSnapshot.from_dict(json.loads(row[0]))
+        if snapshot is None:
+            # Written by an older version in a different format
+            return None, None
+        return snapshot, row[1]
+
+    def save(self, key: Tuple, value: WeatherSnapshot, fetched_at: float):
+        """Insert or replace the payload for a key."""
+        if key[0] not in self.endpoints:
+            return
+        encoded = self._encode_key(key)
+        payload = json.dumps(value.to_dict(), separators=(",", ":"))
+        with self._rows_lock:
+            self._rows[encoded] = (payload, fetched_at)
+            if len(self._rows) > self.max_entries:
+                del self._rows[min(self._rows, key=lambda k: self._rows[k][1])]
+        self._enqueue(
+            "INSERT OR REPLACE INTO responses (key, payload, fetched_at) VALUES (?, ?, ?)",
+            (encoded, payload, fetched_at),
+        )
+
+    def delete(self, key: Tuple):
+        """Remove the payload for a key."""
+        if key[0] not in self.endpoints:
+            return
+        encoded = self._encode_key(key)
+        with self._rows_lock:
+            self._rows.pop(encoded, None)
+        self._enqueue("DELETE FROM responses WHERE key = ?", (encoded,))
+
+    def _enqueue(self, sql: str, params: Tuple):
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._run_writer, name="WeatherCacheWriter", daemon=True
+            )
+            self._writer.start()
+        self._queue.put((sql, params))
+
+    def _run_writer(self):
+        """Commit queued statements until ``close()``, compacting every ``compact_every`` writes."""
+        # The table must exist before the first write
+        self.open()
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            # Everything queued so far goes into one transaction
+            batch = [self._queue.get()]
+            while batch[-1] is not _FLUSH and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = batch[-1] is _STOP
+            statements = [item for item in batch if item is not _FLUSH and item is not _STOP]
+            if statements:
+                try:
+                    with conn:
+                        for sql, params in statements:
+                            conn.execute(sql, params)
+                except sqlite3.Error as e:
+                    print(f"Error writing weather cache: {e}")
+                self._writes_since_compact += len(statements)
+                if self._writes_since_compact >= self.compact_every:
+                    self._compact(conn)
+            for _ in batch:
+                self._queue.task_done()
+        conn.close()
+
+    def _compact(self, conn: sqlite3.Connection):
+        """Keep only the ``max_entries`` newest rows and give freed pages back."""
+        self._writes_since_compact = 0
+        try:
+            conn.execute(
+                """
+                DELETE FROM responses WHERE key NOT IN (
+                    SELECT key FROM responses ORDER BY fetched_at DESC LIMIT ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            conn.commit()
+            conn.execute("PRAGMA incremental_vacuum")
+        except sqlite3.Error as e:
+            print(f"Error compacting weather cache: {e}")
+
+    def flush(self):
+        """Block until every queued write is committed."""
+        if self._writer is not None:
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self):
+        """Commit pending writes and stop the writer thread."""
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
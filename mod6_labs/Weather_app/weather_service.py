@@ -1,29 +1,358 @@
 """Weather API service layer."""
-import httpx
-from typing import Dict
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Tuple
 from config import Config
+from fast_json import decode_forecast, decode_weather
+from models import ForecastSeries, WeatherSnapshot
+from weather_cache import ResponseCache
+from resilience import (
+    CircuitBreaker,
+    TokenBucket,
+    backoff_delay,
+    parse_retry_after,
+    shared_rate_limiter,
+)
+
+if TYPE_CHECKING:
+    import httpx
 
 class WeatherServiceError(Exception):
     """Custom exception for weather service errors."""
     pass
 
+
+class UpstreamUnavailableError(WeatherServiceError):
+    """Raised when the API is down or unreachable, or the circuit is open."""
+    pass
+
+
+class CityNotFoundError(WeatherServiceError):
+    """Raised when the API does not know the requested city (HTTP 404)."""
+    pass
+
+
+class RateLimitedError(WeatherServiceError):
+    """Raised when the API still answers 429 (over our quota) after the retries."""
+    pass
+
+
+def http2_available() -> bool:
+    """Check if the optional 'h2' package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _httpx():
+    """Import httpx on first use, keeping it off the app's startup path."""
+    import httpx
+    return httpx
+
+
 class WeatherService:
-    """Service for fetching weather data from OpenWeatherMap API."""
+    """Service for fetching weather data from OpenWeatherMap API.
+    
+    One pooled ``httpx.AsyncClient`` is shared by every request so repeat
+    lookups reuse warm keep-alive connections instead of paying DNS, TCP
+    and TLS setup each time. Call ``aclose()`` (or use the service as an
+    async context manager) when the app shuts down.
+    
+    Responses are kept in a ``ResponseCache`` so repeated lookups of the
+    same city are served locally until their TTL runs out, and concurrent
+    lookups of the same query share a single in-flight request.
+    
+    Requests pass through a process-wide token-bucket rate limiter and are
+    retried with jittered exponential backoff on timeouts, 429 and 5xx.
+    A circuit breaker stops calling an unhealthy API; meanwhile cached
+    data is served when there is any.
+    """
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        cache: Optional[ResponseCache] = None,
+        use_cache: bool = True,
+        stale_while_revalidate: Optional[bool] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        max_retries: Optional[int] = None,
+        base_url: Optional[str] = None,
+        forecast_url: Optional[str] = None,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+    ):
         self.api_key = Config.API_KEY
-        self.base_url = Config.BASE_URL
+        self.base_url = base_url or Config.BASE_URL
+        self.forecast_url = forecast_url or Config.FORECAST_URL
         self.timeout = Config.TIMEOUT
+        # Custom transport, e.g. httpx.MockTransport for offline benchmarks
+        self.transport = transport
+        # Keyword arguments for httpx.Limits, built with the client
+        self.limits = dict(
+            max_connections=max_connections or Config.MAX_CONNECTIONS,
+            max_keepalive_connections=(
+                max_keepalive_connections or Config.MAX_KEEPALIVE_CONNECTIONS
+            ),
+            keepalive_expiry=keepalive_expiry or Config.KEEPALIVE_EXPIRY,
+        )
+        if http2 is None:
+            http2 = Config.HTTP2
+        # HTTP/2 needs the optional 'h2' package, otherwise fall back to HTTP/1.1
+        self.http2 = http2 and http2_available()
+        self._client: Optional["httpx.AsyncClient"] = None
+        
+        if use_cache and cache is None:
+            cache = ResponseCache()
+        self.cache = cache if use_cache else None
+        if stale_while_revalidate is None:
+            stale_while_revalidate = Config.STALE_WHILE_REVALIDATE
+        self.stale_while_revalidate = stale_while_revalidate
+        self._in_flight: Dict[Tuple, asyncio.Task] = {}
+        
+        self.rate_limiter = rate_limiter or shared_rate_limiter
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.max_retries = Config.MAX_RETRIES if max_retries is None else max_retries
+        self.metrics = {
+            "requests": 0,
+            "throttled": 0,
+            "retried": 0,
+            "short_circuited": 0,
+            "served_stale": 0,
+        }
+    
+    async def __aenter__(self) -> "WeatherService":
+        await self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    async def start(self) -> "httpx.AsyncClient":
+        """Create the shared HTTP client, importing httpx off the event loop."""
+        await asyncio.to_thread(_httpx)
+        return self._get_client()
+    
+    async def aclose(self):
+        """Close the shared HTTP client and its pooled connections."""
+        for task in list(self._in_flight.values()):
+            task.cancel()
+        self._in_flight.clear()
+        
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+    
+    def _get_client(self) -> "httpx.AsyncClient":
+        """Return the shared client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            httpx = _httpx()
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(**self.limits),
+                http2=self.http2,
+                transport=self.transport,
+            )
+        return self._client
     
-    async def get_weather(self, city: str) -> Dict:
+    async def fetch_asset(self, url: str) -> bytes:
+        """
+        Download a static file, such as a weather icon, over the shared client.
+        
+        Static files are not API calls, so they skip the rate limiter,
+        retries and the circuit breaker.
+        """
+        try:
+            response = await self._get_client().get(url)
+        except _httpx().HTTPError as e:
+            raise WeatherServiceError(f"HTTP error occurred: {str(e)}")
+        if response.status_code != 200:
+            raise WeatherServiceError(f"Error fetching {url}: {response.status_code}")
+        return response.content
+    
+    def stats(self) -> Dict:
+        """Return request, retry, circuit breaker and cache counters."""
+        stats = dict(self.metrics)
+        stats["circuit_state"] = self.circuit_breaker.state
+        stats["circuit_trips"] = self.circuit_breaker.trips
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+    
+    async def _send(self, url: str, params: Dict) -> "httpx.Response":
+        """
+        Send a GET request through the rate limiter, retrying transient failures.
+        
+        Timeouts, network errors, 429 and 5xx responses are retried with
+        jittered exponential backoff, waiting at least as long as the
+        server's Retry-After header asks.
+        
+        Returns:
+            The response; a 429 is returned once retries run out
+            
+        Raises:
+            UpstreamUnavailableError: If the circuit is open or the API
+                stays unavailable after all retries
+        """
+        if not self.circuit_breaker.allow_request():
+            self.metrics["short_circuited"] += 1
+            raise UpstreamUnavailableError(
+                "Weather service is currently unavailable. "
+                "Please try again later."
+            )
+        
+        client = self._get_client()
+        httpx = _httpx()
+        attempt = 0
+        while True:
+            if await self.rate_limiter.acquire() > 0:
+                self.metrics["throttled"] += 1
+            self.metrics["requests"] += 1
+            
+            response = None
+            error = None
+            try:
+                response = await client.get(url, params=params)
+            except httpx.TimeoutException:
+                error = UpstreamUnavailableError(
+                    "Request timed out. Please check your internet connection."
+                )
+            except httpx.NetworkError:
+                error = UpstreamUnavailableError(
+                    "Network error. Please check your internet connection."
+                )
+            
+            if response is not None:
+                if response.status_code >= 500:
+                    error = UpstreamUnavailableError(
+                        "Weather service is currently unavailable. "
+                        "Please try again later."
+                    )
+                elif response.status_code != 429:
+                    self.circuit_breaker.record_success()
+                    return response
+            
+            delay = backoff_delay(attempt)
+            if response is not None:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+            
+            # Give up when out of retries or asked to wait longer than we would
+            if attempt >= self.max_retries or delay > Config.RETRY_MAX_DELAY:
+                if error is None:
+                    # Over our quota (429) isn't an upstream outage
+                    return response
+                self.circuit_breaker.record_failure()
+                raise error
+            
+            attempt += 1
+            self.metrics["retried"] += 1
+            await asyncio.sleep(delay)
+    
+    async def _cached(
+        self,
+        key: Tuple,
+        fetch: Callable[[], Awaitable[Any]],
+        allow_stale: bool = True,
+        max_age: Optional[float] = None,
+    ) -> Any:
+        """Serve a response from the cache when possible, otherwise fetch it."""
+        if self.cache is not None and not self._older_than(key, max_age):
+            data, is_stale = self.cache.lookup(key)
+            if data is not None:
+                if not is_stale:
+                    return data
+                if self.stale_while_revalidate and allow_stale:
+                    self._revalidate(key, fetch)
+                    return data
+        
+        try:
+            # Shielded so a cancelled caller doesn't abort the request for the others
+            return await asyncio.shield(self._single_flight(key, fetch))
+        except UpstreamUnavailableError:
+            # The API is unhealthy: fall back to the last known data, however old
+            if self.cache is None:
+                raise
+            data, _ = self.cache.peek(key)
+            if data is None:
+                raise
+            self.metrics["served_stale"] += 1
+            return data
+    
+    def _older_than(self, key: Tuple, max_age: Optional[float]) -> bool:
+        """Whether the cached entry for a key was fetched more than ``max_age`` seconds ago."""
+        if max_age is None:
+            return False
+        _, fetched_at = self.cache.peek(key)
+        return fetched_at is not None and time.time() - fetched_at > max_age
+    
+    def _single_flight(self, key: Tuple, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Return the in-flight request for a key, starting one if needed."""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(key, fetch))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._finish_flight(key, t))
+        return task
+    
+    def _finish_flight(self, key: Tuple, task: asyncio.Task):
+        """Forget a finished request so the next lookup starts a new one."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the error as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+    
+    async def _fetch_and_store(self, key: Tuple, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Fetch a response and put it in the cache."""
+        data = await fetch()
+        if self.cache is not None:
+            self.cache.store(key, data)
+        return data
+    
+    def _revalidate(self, key: Tuple, fetch: Callable[[], Awaitable[Any]]):
+        """Refresh a stale cache entry in the background."""
+        def report(task: asyncio.Task):
+            if not task.cancelled() and task.exception() is not None:
+                print(f"Background refresh failed: {task.exception()}")
+        
+        if key not in self._in_flight:
+            self._single_flight(key, fetch).add_done_callback(report)
+    
+    def get_cached_weather(self, city: str) -> Optional[WeatherSnapshot]:
+        """Return the last known weather for a city (however old) without a request."""
+        if self.cache is None:
+            return None
+        data, _ = self.cache.peek(ResponseCache.make_key("weather", Config.UNITS, q=city))
+        return data
+    
+    def get_cached_weather_by_id(self, city_id: int) -> Optional[WeatherSnapshot]:
+        """Return the last known weather for a city ID without a request."""
+        if self.cache is None:
+            return None
+        data, _ = self.cache.peek(ResponseCache.make_key("weather", Config.UNITS, id=city_id))
+        return data
+    
+    async def get_weather(
+        self, city: str, allow_stale: bool = True, max_age: Optional[float] = None
+    ) -> WeatherSnapshot:
         """
         Fetch weather data for a given city.
         
         Args:
             city: Name of the city
+            allow_stale: Whether an expired cache entry may be returned
+                while it is refreshed in the background
+            max_age: Fetch again if the cached entry is older than this
+                many seconds, even if it has not expired yet
             
         Returns:
-            Dictionary containing weather data
+            WeatherSnapshot with the current conditions
             
         Raises:
             WeatherServiceError: If the request fails
@@ -31,6 +360,11 @@ class WeatherService:
         if not city:
             raise WeatherServiceError("City name cannot be empty")
         
+        key = ResponseCache.make_key("weather", Config.UNITS, q=city)
+        return await self._cached(key, lambda: self._fetch_weather(city), allow_stale, max_age)
+    
+    async def _fetch_weather(self, city: str) -> WeatherSnapshot:
+        """Fetch current weather for a city from the API (no caching)."""
         # Build request parameters
         params = {
             "q": city,
@@ -39,49 +373,102 @@ class WeatherService:
         }
         
         try:
-            # Make async HTTP request
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.base_url, params=params)
+            # Make async HTTP request over the shared connection pool
+            response = await self._send(self.base_url, params)
             
             # Check for HTTP errors
             if response.status_code == 404:
-                raise WeatherServiceError(
+                raise CityNotFoundError(
                     f"City '{city}' not found. Please check the spelling."
                 )
             elif response.status_code == 401:
                 raise WeatherServiceError(
                     "Invalid API key. Please check your configuration."
                 )
-            elif response.status_code >= 500:
-                raise WeatherServiceError(
-                    "Weather service is currently unavailable. "
-                    "Please try again later."
+            elif response.status_code == 429:
+                raise RateLimitedError(
+                    "Too many requests. Please wait a moment and try again."
                 )
             elif response.status_code != 200:
                 raise WeatherServiceError(
                     f"Error fetching weather data: {response.status_code}"
                 )
             
-            # Parse JSON response
-            data = response.json()
-            return data
+            # Decode JSON response once into the compact model
+            return decode_weather(response.content)
             
-        except httpx.TimeoutException:
-            raise WeatherServiceError(
-                "Request timed out. Please check your internet connection."
-            )
-        except httpx.NetworkError:
-            raise WeatherServiceError(
-                "Network error. Please check your internet connection."
-            )
-        except httpx.HTTPError as e:
+        except WeatherServiceError:
+            raise
+        except _httpx().HTTPError as e:
             raise WeatherServiceError(f"HTTP error occurred: {str(e)}")
         except Exception as e:
             raise WeatherServiceError(f"An unexpected error occurred: {str(e)}")
     
-    async def get_forecast(self, city: str) -> Dict:
+    async def iter_weather_many(
+        self,
+        cities: Iterable[str],
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[str, Optional[WeatherSnapshot], Optional[WeatherServiceError]]]:
+        """
+        Fetch weather for several cities, yielding each result as it arrives.
+        
+        At most ``concurrency`` requests run at once so a long favorites
+        list doesn't burst past the API rate limit.
+        
+        Args:
+            cities: City names to look up
+            concurrency: Maximum number of parallel requests
+            
+        Yields:
+            ``(city, data, error)`` tuples in completion order; exactly one
+            of ``data`` and ``error`` is set
+        """
+        semaphore = asyncio.Semaphore(concurrency or Config.BATCH_CONCURRENCY)
+        
+        async def fetch_one(city: str):
+            async with semaphore:
+                try:
+                    return city, await self.get_weather(city), None
+                except WeatherServiceError as e:
+                    return city, None, e
+        
+        tasks = [asyncio.ensure_future(fetch_one(city)) for city in dict.fromkeys(cities)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The caller stopped early: drop lookups that haven't finished
+            for task in tasks:
+                task.cancel()
+    
+    async def get_weather_many(
+        self,
+        cities: Iterable[str],
+        concurrency: Optional[int] = None,
+    ) -> Tuple[Dict[str, WeatherSnapshot], Dict[str, WeatherServiceError]]:
+        """
+        Fetch weather for several cities with bounded concurrency.
+        
+        Returns:
+            ``(results, errors)`` dictionaries keyed by the requested city
+            name; a failed city never fails the whole batch
+        """
+        results: Dict[str, WeatherSnapshot] = {}
+        errors: Dict[str, WeatherServiceError] = {}
+        async for city, data, error in self.iter_weather_many(cities, concurrency):
+            if error is None:
+                results[city] = data
+            else:
+                errors[city] = error
+        return results, errors
+    
+    async def get_forecast(self, city: str) -> ForecastSeries:
         """Get 5-day weather forecast."""
-        forecast_url = "https://api.openweathermap.org/data/2.5/forecast"
+        key = ResponseCache.make_key("forecast", Config.UNITS, q=city)
+        return await self._cached(key, lambda: self._fetch_forecast(city))
+    
+    async def _fetch_forecast(self, city: str) -> ForecastSeries:
+        """Fetch the 5-day forecast from the API (no caching)."""
         params = {
             "q": city,
             "appid": self.api_key,
@@ -89,15 +476,21 @@ class WeatherService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(forecast_url, params=params)
-                response.raise_for_status()
-                return response.json()
+            response = await self._send(self.forecast_url, params)
+            response.raise_for_status()
+            return decode_forecast(response.content)
+        except WeatherServiceError:
+            raise
         except Exception as e:
             raise WeatherServiceError(f"Error fetching forecast: {str(e)}")
     
-    async def get_weather_by_coordinates(self, lat: float, lon: float) -> Dict:
+    async def get_weather_by_coordinates(self, lat: float, lon: float) -> WeatherSnapshot:
         """Fetch weather data by coordinates."""
+        key = ResponseCache.make_key("weather", Config.UNITS, lat=lat, lon=lon)
+        return await self._cached(key, lambda: self._fetch_weather_by_coordinates(lat, lon))
+    
+    async def _fetch_weather_by_coordinates(self, lat: float, lon: float) -> WeatherSnapshot:
+        """Fetch weather data by coordinates from the API (no caching)."""
         params = {
             "lat": lat,
             "lon": lon,
@@ -106,9 +499,65 @@ class WeatherService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.base_url, params=params)
-                response.raise_for_status()
-                return response.json()
+            response = await self._send(self.base_url, params)
+            response.raise_for_status()
+            return decode_weather(response.content)
+        except WeatherServiceError:
+            raise
+        except Exception as e:
+            raise WeatherServiceError(f"Error fetching weather data: {str(e)}")
+    
+    async def get_weather_by_id(
+        self, city_id: int, allow_stale: bool = True, max_age: Optional[float] = None
+    ) -> WeatherSnapshot:
+        """
+        Fetch weather data by OpenWeatherMap city ID.
+        
+        IDs come from the bulk city list (see ``gazetteer``), so unlike a
+        name query the lookup cannot miss or pick a different city.
+        """
+        key = ResponseCache.make_key("weather", Config.UNITS, id=city_id)
+        return await self._cached(key, lambda: self._fetch_weather_by_id(city_id), allow_stale, max_age)
+    
+    async def _fetch_weather_by_id(self, city_id: int) -> WeatherSnapshot:
+        """Fetch weather data by city ID from the API (no caching)."""
+        params = {
+            "id": city_id,
+            "appid": self.api_key,
+            "units": Config.UNITS,
+        }
+        
+        try:
+            response = await self._send(self.base_url, params)
+            if response.status_code == 404:
+                raise CityNotFoundError(f"City ID {city_id} not found.")
+            if response.status_code == 429:
+                raise RateLimitedError("Too many requests. Please wait a moment and try again.")
+            response.raise_for_status()
+            return decode_weather(response.content)
+        except WeatherServiceError:
+            raise
+        except Exception as e:
+            raise WeatherServiceError(f"Error fetching weather data: {str(e)}")
+    
+    async def get_forecast_by_id(self, city_id: int) -> ForecastSeries:
+        """Get the 5-day forecast by OpenWeatherMap city ID."""
+        key = ResponseCache.make_key("forecast", Config.UNITS, id=city_id)
+        return await self._cached(key, lambda: self._fetch_forecast_by_id(city_id))
+    
+    async def _fetch_forecast_by_id(self, city_id: int) -> ForecastSeries:
+        """Fetch the 5-day forecast by city ID from the API (no caching)."""
+        params = {
+            "id": city_id,
+            "appid": self.api_key,
+            "units": Config.UNITS,
+        }
+        
+        try:
+            response = await self._send(self.forecast_url, params)
+            response.raise_for_status()
+            return decode_forecast(response.content)
+        except WeatherServiceError:
+            raise
         except Exception as e:
-            raise WeatherServiceError(f"Error fetching weather data: {str(e)}")
\ No newline at end of file
+            raise WeatherServiceError(f"Error fetching forecast: {str(e)}")
\ No newline at end of file
@@ -1,6 +1,18 @@
 import flet as ft
+import asyncio
 import re
-from database import update_contact_db, delete_contact_db, add_contact_db, get_all_contacts_db
+import threading
+from database import (
+    DuplicateContactError,
+    update_contact_db,
+    delete_contact_db,
+    add_contact_db,
+    search_contacts_cached,
+)
+
+SEARCH_DEBOUNCE = 0.3  # seconds of typing pause before searching
+LOAD_MORE_THRESHOLD = 400  # pixels from the end of the list that load the next page
+FIELD_ORDER = ("name", "phone", "email")  # order of the input fields
 
 # ---------------- Validation Helpers ----------------
 def is_valid_phone(phone: str) -> bool:
@@ -14,66 +26,180 @@ def is_valid_email(email: str) -> bool:
 
 # ---------------- Contact Display ----------------
 def display_contacts(page, contacts_list_view, db_conn, search_term=""):
-    """Fetches and displays all contacts in styled cards."""
-    contacts_list_view.controls.clear()
-    contacts = get_all_contacts_db(db_conn, search_term)
-
-    for contact in contacts:
-        contact_id, name, phone, email = contact
-        initials = "".join([part[0].upper() for part in name.split()[:2]]) if name else "?"
-
-        contact_card = ft.Card(
-            content=ft.Container(
-                content=ft.Row(
-                    [
-                        # Avatar Circle
-                        ft.CircleAvatar(
-                            content=ft.Text(initials, color=ft.Colors.WHITE, weight=ft.FontWeight.BOLD),
-                            color=ft.Colors.BLUE,
-                            radius=25,
-                        ),
-
-                        # Contact Info
-                        ft.Column(
-                            [
-                                ft.Text(name, size=18, weight=ft.FontWeight.BOLD),
-                                ft.Text(f"📞 {phone or 'N/A'}"),
-                                ft.Text(f"✉️ {email or 'N/A'}"),
-                            ],
-                            spacing=3,
-                            expand=True,
-                        ),
-
-                        # Action Menu
-                        ft.PopupMenuButton(
-                            icon=ft.Icons.MORE_VERT,
-                            items=[
-                                ft.PopupMenuItem(
-                                    text="Edit",
-                                    icon=ft.Icons.EDIT,
-                                    on_click=lambda _, c=contact: open_edit_dialog(page, c, db_conn, contacts_list_view),
-                                ),
-                                ft.PopupMenuItem(),
-                                ft.PopupMenuItem(
-                                    text="Delete",
-                                    icon=ft.Icons.DELETE,
-                                    on_click=lambda _, cid=contact_id: confirm_delete(page, cid, db_conn, contacts_list_view),
-                                ),
-                            ],
-                        ),
-                    ],
-                    alignment=ft.MainAxisAlignment.START,
-                    spacing=15,
-                ),
-                padding=15,
-            ),
-        )
+    """Fetches and displays the first page of contacts in styled cards."""
+    contacts, cursor = search_contacts_cached(db_conn, search_term)
+    render_contacts(page, contacts_list_view, db_conn, contacts, search_term, cursor)
 
-        contacts_list_view.controls.append(contact_card)
 
+def render_contacts(page, contacts_list_view, db_conn, contacts, search_term="", cursor=None):
+    """Displays the given first page of contacts; the rest are loaded while scrolling."""
+    # Cards by contact id, so single changes can find their card
+    cards = {contact[0]: build_contact_card(page, contact, db_conn, contacts_list_view) for contact in contacts}
+    contacts_list_view.controls = list(cards.values())
+    # Where the next page starts, kept with the list it belongs to
+    contacts_list_view.data = {
+        "search_term": search_term,
+        "cursor": cursor,
+        "cards": cards,
+        "lock": threading.Lock(),
+    }
     page.update()
 
 
+def load_more_contacts(page, contacts_list_view, db_conn):
+    """Appends the next page of contacts, if there is one."""
+    state = contacts_list_view.data
+    if not state or state["cursor"] is None or not state["lock"].acquire(blocking=False):
+        return
+    try:
+        contacts, cursor = search_contacts_cached(db_conn, state["search_term"], after=state["cursor"])
+        # A new search or reload replaced the list in the meantime
+        if contacts_list_view.data is not state:
+            return
+        for contact in contacts:
+            card = build_contact_card(page, contact, db_conn, contacts_list_view)
+            state["cards"][contact[0]] = card
+            contacts_list_view.controls.append(card)
+        state["cursor"] = cursor
+        contacts_list_view.update()
+    finally:
+        state["lock"].release()
+
+
+def make_scroll_handler(page, contacts_list_view, db_conn):
+    """Returns an on_scroll handler that loads the next page near the end of the list."""
+    def on_scroll(e):
+        if e.pixels >= e.max_scroll_extent - LOAD_MORE_THRESHOLD:
+            load_more_contacts(page, contacts_list_view, db_conn)
+
+    return on_scroll
+
+
+def build_contact_card(page, contact, db_conn, contacts_list_view):
+    """Builds the styled card for one contact."""
+    card = ft.Card(
+        content=ft.Container(
+            content=ft.Row(
+                [
+                    # Avatar Circle
+                    ft.CircleAvatar(
+                        content=ft.Text(color=ft.Colors.WHITE, weight=ft.FontWeight.BOLD),
+                        color=ft.Colors.BLUE,
+                        radius=25,
+                    ),
+
+                    # Contact Info
+                    ft.Column(
+                        [
+                            ft.Text(size=18, weight=ft.FontWeight.BOLD),
+                            ft.Text(),
+                            ft.Text(),
+                        ],
+                        spacing=3,
+                        expand=True,
+                    ),
+
+                    # Action Menu (reads the card's current contact, which edits replace)
+                    ft.PopupMenuButton(
+                        icon=ft.Icons.MORE_VERT,
+                        items=[
+                            ft.PopupMenuItem(
+                                text="Edit",
+                                icon=ft.Icons.EDIT,
+                                on_click=lambda _: open_edit_dialog(page, card.data, db_conn, contacts_list_view),
+                            ),
+                            ft.PopupMenuItem(),
+                            ft.PopupMenuItem(
+                                text="Delete",
+                                icon=ft.Icons.DELETE,
+                                on_click=lambda _: confirm_delete(page, card.data[0], db_conn, contacts_list_view),
+                            ),
+                        ],
+                    ),
+                ],
+                alignment=ft.MainAxisAlignment.START,
+                spacing=15,
+            ),
+            padding=15,
+        ),
+    )
+    fill_contact_card(card, contact)
+    return card
+
+
+def fill_contact_card(card, contact):
+    """Puts a contact's details into its card."""
+    contact_id, name, phone, email = contact
+    initials = "".join([part[0].upper() for part in name.split()[:2]]) if name else "?"
+
+    avatar, info, _ = card.content.content.controls
+    avatar.content.value = initials
+    name_text, phone_text, email_text = info.controls
+    name_text.value = name
+    phone_text.value = f"📞 {phone or 'N/A'}"
+    email_text.value = f"✉️ {email or 'N/A'}"
+    card.data = contact
+
+
+def insert_contact_card(page, contacts_list_view, db_conn, contact):
+    """Shows a newly added contact by adding just its card."""
+    state = contacts_list_view.data
+    if not state or state["search_term"]:
+        # Whether it matches the search is up to the database
+        display_contacts(page, contacts_list_view, db_conn, state["search_term"] if state else "")
+        return
+    if state["cursor"] is not None:
+        # Ids only grow, so it belongs on a page that is not loaded yet;
+        # say it was saved, since no card appears for it
+        page.snack_bar = ft.SnackBar(ft.Text(f"{contact[1]} added"), open=True)
+        return
+
+    card = build_contact_card(page, contact, db_conn, contacts_list_view)
+    state["cards"][contact[0]] = card
+    contacts_list_view.controls.append(card)
+    contacts_list_view.update()
+
+
+def update_contact_card(contacts_list_view, contact):
+    """Shows an edited contact by changing its card in place."""
+    state = contacts_list_view.data
+    card = state["cards"].get(contact[0]) if state else None
+    if card is None:
+        return
+    fill_contact_card(card, contact)
+    card.update()
+
+
+def remove_contact_card(contacts_list_view, contact_id):
+    """Removes a deleted contact's card."""
+    state = contacts_list_view.data
+    card = state["cards"].pop(contact_id, None) if state else None
+    if card is None:
+        return
+    contacts_list_view.controls.remove(card)
+    contacts_list_view.update()
+
+
+# ---------------- Search ----------------
+def make_search_handler(page, contacts_list_view, db_conn):
+    """Returns an on_change handler that searches once typing pauses, skipping stale searches."""
+    current = {"task": None}
+
+    async def search(search_term):
+        task = asyncio.current_task()
+        previous, current["task"] = current["task"], task
+        if previous is not None and not previous.done():
+            previous.cancel()
+
+        await asyncio.sleep(SEARCH_DEBOUNCE)
+        # Query off the UI thread; a newer keystroke may still supersede it
+        contacts, cursor = await asyncio.to_thread(search_contacts_cached, db_conn, search_term)
+        if current["task"] is task:
+            render_contacts(page, contacts_list_view, db_conn, contacts, search_term, cursor)
+
+    return lambda e: page.run_task(search, e.control.value)
+
+
 # ---------------- Add Contact ----------------
 def add_contact(page, inputs, contacts_list_view, db_conn):
     name_input, phone_input, email_input = inputs
@@ -94,8 +220,14 @@ def add_contact(page, inputs, contacts_list_view, db_conn):
         page.update()
         return
 
+    contact = (name_input.value.strip(), phone_input.value.strip(), email_input.value.strip())
     try:
-        add_contact_db(db_conn, name_input.value.strip(), phone_input.value.strip(), email_input.value.strip())
+        contact_id = add_contact_db(db_conn, *contact)
+    except DuplicateContactError as e:
+        # Point at the field that is already used
+        inputs[FIELD_ORDER.index(e.field)].error_text = str(e)
+        page.update()
+        return
     except ValueError as e:
         page.snack_bar = ft.SnackBar(ft.Text(str(e)), open=True)
         page.update()
@@ -104,7 +236,7 @@ def add_contact(page, inputs, contacts_list_view, db_conn):
     for field in inputs:
         field.value, field.error_text = "", None
 
-    display_contacts(page, contacts_list_view, db_conn)
+    insert_contact_card(page, contacts_list_view, db_conn, (contact_id, *contact))
     page.update()
 
 
@@ -112,7 +244,7 @@ def add_contact(page, inputs, contacts_list_view, db_conn):
 def confirm_delete(page, contact_id, db_conn, contacts_list_view):
     def delete_and_close(e):
         delete_contact_db(db_conn, contact_id)
-        display_contacts(page, contacts_list_view, db_conn)
+        remove_contact_card(contacts_list_view, contact_id)
         dialog.open = False
         page.update()
 
@@ -152,10 +284,16 @@ def open_edit_dialog(page, contact, db_conn, contacts_list_view):
             page.update()
             return
 
-        update_contact_db(db_conn, contact_id, edit_name.value.strip(), edit_phone.value.strip(), edit_email.value.strip())
+        edited = (contact_id, edit_name.value.strip(), edit_phone.value.strip(), edit_email.value.strip())
+        try:
+            update_contact_db(db_conn, *edited)
+        except DuplicateContactError as error:
+            (edit_name, edit_phone, edit_email)[FIELD_ORDER.index(error.field)].error_text = str(error)
+            page.update()
+            return
         dialog.open = False
         page.update()
-        display_contacts(page, contacts_list_view, db_conn)
+        update_contact_card(contacts_list_view, edited)
 
     dialog = ft.AlertDialog(
         modal=True,
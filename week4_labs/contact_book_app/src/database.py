@@ -1,5 +1,60 @@
 import os
+import re
 import sqlite3
+import threading
+from collections import OrderedDict
+
+CONTACTS_PAGE_SIZE = 50  # contacts loaded at a time
+SEARCH_CACHE_SIZE = 32  # recent search result pages kept in memory
+
+_search_cache = OrderedDict()
+_search_cache_lock = threading.Lock()
+_search_generation = 0  # bumped by every write
+
+# The app shares one connection between the UI thread and search worker
+# threads; every use of it holds this lock so statements, commits and
+# rollbacks from different threads never interleave
+_conn_lock = threading.RLock()
+
+KEYS_VERSION = 1  # PRAGMA user_version once the duplicate keys are filled in
+DUPLICATE_FIELDS = (("name_key", "name"), ("phone_key", "phone"), ("email_key", "email"))
+
+
+class DuplicateContactError(ValueError):
+    """Raised when a contact's name, phone or email is already used; `field` says which."""
+
+    def __init__(self, field):
+        super().__init__(f"A contact with this {field} already exists")
+        self.field = field
+
+
+# ---------------- Normalization ----------------
+def normalize_name(name):
+    """Name as compared for duplicates: case and extra spaces ignored."""
+    return " ".join(name.split()).casefold() or None
+
+
+def normalize_phone(phone):
+    """E.164-style phone key: digits only, with a leading + for international numbers."""
+    phone = (phone or "").strip()
+    digits = re.sub(r"\D", "", phone)
+    if not digits:
+        return None
+    if phone.startswith("+"):
+        return "+" + digits
+    if digits.startswith("00"):
+        return "+" + digits[2:]
+    return digits
+
+
+def normalize_email(email):
+    """Email key: trimmed and casefolded."""
+    return (email or "").strip().casefold() or None
+
+
+def contact_keys(name, phone, email):
+    return normalize_name(name), normalize_phone(phone), normalize_email(email)
+
 
 def init_db():
     """Initializes the database and creates the contacts table if it doesn't exist."""
@@ -22,42 +77,242 @@ def init_db():
         )
     ''')
     conn.commit()
+
+    create_duplicate_keys(conn)
+    create_search_index(conn)
     return conn
 
 
+def create_duplicate_keys(conn):
+    """Adds the normalized name/phone/email columns with their unique indexes, and fills them for existing databases."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(contacts)")}
+    for column, _ in DUPLICATE_FIELDS:
+        if column not in columns:
+            conn.execute(f"ALTER TABLE contacts ADD COLUMN {column} TEXT")
+    # Partial indexes: contacts without a phone or email never collide
+    for column, _ in DUPLICATE_FIELDS:
+        conn.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS idx_contacts_{column} ON contacts ({column}) "
+            f"WHERE {column} IS NOT NULL"
+        )
+    conn.commit()
+
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= KEYS_VERSION:
+        return
+    rows = conn.execute("SELECT id, name, phone, email FROM contacts ORDER BY id").fetchall()
+    with conn:
+        for contact_id, name, phone, email in rows:
+            # Column by column, so an older duplicate keeps its key and only
+            # the colliding field of the newer one stays empty
+            for (column, _), key in zip(DUPLICATE_FIELDS, contact_keys(name, phone, email)):
+                conn.execute(f"UPDATE OR IGNORE contacts SET {column} = ? WHERE id = ?", (key, contact_id))
+        conn.execute(f"PRAGMA user_version = {KEYS_VERSION}")
+
+
+def find_duplicate_field(conn, keys, exclude_id=None):
+    """Returns which field ('name', 'phone' or 'email') another contact already uses, or None."""
+    for (column, field), key in zip(DUPLICATE_FIELDS, keys):
+        if key is None:
+            continue
+        row = conn.execute(
+            f"SELECT id FROM contacts WHERE {column} = ? AND id IS NOT ?", (key, exclude_id)
+        ).fetchone()
+        if row:
+            return field
+    return None
+
+
+def has_search_index(conn):
+    """Checks whether the full-text search index exists."""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'contacts_fts'"
+    ).fetchone() is not None
+
+
+def create_search_index(conn):
+    """Creates the full-text search index over name, phone and email, and fills it for existing databases."""
+    if has_search_index(conn):
+        return
+
+    try:
+        # Trigram tokens match any part of a name, number or address, like LIKE '%term%'
+        conn.executescript('''
+            BEGIN;
+            CREATE VIRTUAL TABLE contacts_fts USING fts5(
+                name, phone, email,
+                content='contacts', content_rowid='id', tokenize='trigram'
+            );
+
+            -- Keep the index in sync with the contacts table
+            CREATE TRIGGER contacts_fts_insert AFTER INSERT ON contacts BEGIN
+                INSERT INTO contacts_fts (rowid, name, phone, email)
+                VALUES (new.id, new.name, new.phone, new.email);
+            END;
+            CREATE TRIGGER contacts_fts_delete AFTER DELETE ON contacts BEGIN
+                INSERT INTO contacts_fts (contacts_fts, rowid, name, phone, email)
+                VALUES ('delete', old.id, old.name, old.phone, old.email);
+            END;
+            CREATE TRIGGER contacts_fts_update AFTER UPDATE OF name, phone, email ON contacts BEGIN
+                INSERT INTO contacts_fts (contacts_fts, rowid, name, phone, email)
+                VALUES ('delete', old.id, old.name, old.phone, old.email);
+                INSERT INTO contacts_fts (rowid, name, phone, email)
+                VALUES (new.id, new.name, new.phone, new.email);
+            END;
+
+            -- Index the contacts saved before the search index existed
+            INSERT INTO contacts_fts (contacts_fts) VALUES ('rebuild');
+            COMMIT;
+        ''')
+    except sqlite3.OperationalError as e:
+        # SQLite without FTS5 or the trigram tokenizer (older than 3.34): search uses LIKE
+        conn.rollback()
+        print(f"Full-text search unavailable: {e}")
+
+
 def add_contact_db(conn, name, phone, email):
-    """Adds a new contact to the database, prevents duplicates."""
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM contacts WHERE name=? OR phone=? OR email=?", (name, phone, email))
-    if cursor.fetchone():
-        raise ValueError("Contact already exists")
+    """Adds a new contact to the database, prevents duplicates. Returns the new contact's id."""
+    with _conn_lock:
+        keys = contact_keys(name, phone, email)
+        cursor = conn.cursor()
+        # The unique indexes decide, so two writers can't both insert the same contact
+        cursor.execute(
+            "INSERT INTO contacts (name, phone, email, name_key, phone_key, email_key) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+            (name, phone, email, *keys),
+        )
+        if cursor.rowcount == 0:
+            conn.rollback()
+            raise DuplicateContactError(find_duplicate_field(conn, keys) or "name")
+        conn.commit()
+        invalidate_search_cache()
+        return cursor.lastrowid
+
+
+def fts_phrase(search_term):
+    """Quotes a search term as one full-text phrase, so it matches like a substring."""
+    return '"' + search_term.replace('"', '""') + '"'
 
-    cursor.execute("INSERT INTO contacts (name, phone, email) VALUES (?, ?, ?)", (name, phone, email))
-    conn.commit()
+
+def like_pattern(search_term):
+    """Builds a LIKE pattern matching the term anywhere (use with ESCAPE '\\')."""
+    return "%" + search_term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
 
 
 def get_all_contacts_db(conn, search_term=""):
-    """Retrieves all contacts from the database, supports search."""
-    cursor = conn.cursor()
-    if search_term:
-        cursor.execute("SELECT id, name, phone, email FROM contacts WHERE name LIKE ?", (f"%{search_term}%",))
-    else:
-        cursor.execute("SELECT id, name, phone, email FROM contacts")
-    return cursor.fetchall()
+    """Retrieves all contacts from the database, supports search by name, phone or email."""
+    contacts, after = get_contacts_page_db(conn, search_term)
+    while after is not None:
+        page, after = get_contacts_page_db(conn, search_term, after)
+        contacts.extend(page)
+    return contacts
+
+
+def get_contacts_page_db(conn, search_term="", after=None, limit=CONTACTS_PAGE_SIZE):
+    """
+    Retrieves one page of contacts, supports search by name, phone or email.
+
+    Pages use keyset pagination: pass the returned cursor as `after` to get
+    the next page, which seeks straight to it instead of skipping rows.
+    Returns (contacts, cursor); the cursor is None on the last page.
+    """
+    with _conn_lock:
+        cursor = conn.cursor()
+        search_term = search_term.strip()
+        if not search_term:
+            cursor.execute(
+                "SELECT id, name, phone, email FROM contacts WHERE id > ? ORDER BY id LIMIT ?",
+                (after[0] if after else 0, limit + 1),
+            )
+            rows = cursor.fetchall()
+            contacts = rows[:limit]
+            next_after = (contacts[-1][0],) if len(rows) > limit else None
+        elif len(search_term) >= 3 and has_search_index(conn):
+            # Best matches first (a name match counting most), then by id for a stable order
+            phrase = fts_phrase(search_term)
+            seek = "WHERE (score, id) > (?, ?)" if after else ""
+            cursor.execute(
+                f"""
+                SELECT id, name, phone, email, score FROM (
+                    SELECT contacts.id, contacts.name, contacts.phone, contacts.email,
+                           bm25(contacts_fts, 10.0, 1.0, 1.0) AS score
+                    FROM contacts_fts
+                    JOIN contacts ON contacts.id = contacts_fts.rowid
+                    WHERE contacts_fts MATCH ?
+                )
+                {seek}
+                ORDER BY score, id
+                LIMIT ?
+                """,
+                (phrase, *(after or ()), limit + 1),
+            )
+            rows = cursor.fetchall()
+            contacts = [row[:4] for row in rows[:limit]]
+            next_after = (rows[limit - 1][4], rows[limit - 1][0]) if len(rows) > limit else None
+        else:
+            # Trigrams need at least 3 characters
+            pattern = like_pattern(search_term)
+            cursor.execute(
+                "SELECT id, name, phone, email FROM contacts "
+                "WHERE (name LIKE ? ESCAPE '\\' OR phone LIKE ? ESCAPE '\\' OR email LIKE ? ESCAPE '\\') "
+                "AND id > ? ORDER BY id LIMIT ?",
+                (pattern, pattern, pattern, after[0] if after else 0, limit + 1),
+            )
+            rows = cursor.fetchall()
+            contacts = rows[:limit]
+            next_after = (contacts[-1][0],) if len(rows) > limit else None
+        return contacts, next_after
+
+
+def search_contacts_cached(conn, search_term="", after=None, limit=CONTACTS_PAGE_SIZE):
+    """Same as get_contacts_page_db, but repeated pages are served from a small LRU cache."""
+    key = (id(conn), search_term.strip(), after, limit)
+    with _search_cache_lock:
+        if key in _search_cache:
+            _search_cache.move_to_end(key)
+            return _search_cache[key]
+        generation = _search_generation
+
+    result = get_contacts_page_db(conn, search_term, after, limit)
+
+    with _search_cache_lock:
+        # Don't cache a result that a write made stale while it was being read
+        if generation == _search_generation:
+            _search_cache[key] = result
+            if len(_search_cache) > SEARCH_CACHE_SIZE:
+                _search_cache.popitem(last=False)
+    return result
+
+
+def invalidate_search_cache():
+    """Forgets cached search results; called after every write."""
+    global _search_generation
+    with _search_cache_lock:
+        _search_generation += 1
+        _search_cache.clear()
 
 
 def update_contact_db(conn, contact_id, name, phone, email):
-    """Updates an existing contact in the database."""
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE contacts SET name = ?, phone = ?, email = ? WHERE id = ?",
-        (name, phone, email, contact_id)
-    )
-    conn.commit()
+    """Updates an existing contact in the database, prevents duplicates."""
+    with _conn_lock:
+        keys = contact_keys(name, phone, email)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "UPDATE contacts SET name = ?, phone = ?, email = ?, name_key = ?, phone_key = ?, email_key = ? "
+                "WHERE id = ?",
+                (name, phone, email, *keys, contact_id)
+            )
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            raise DuplicateContactError(find_duplicate_field(conn, keys, contact_id) or "name")
+        conn.commit()
+        invalidate_search_cache()
 
 
 def delete_contact_db(conn, contact_id):
     """Deletes a contact from the database."""
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM contacts WHERE id = ?", (contact_id,))
-    conn.commit()
+    with _conn_lock:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM contacts WHERE id = ?", (contact_id,))
+        conn.commit()
+        invalidate_search_cache()
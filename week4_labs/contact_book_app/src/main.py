@@ -1,6 +1,6 @@
 import flet as ft
 from database import init_db
-from app_logic import display_contacts, add_contact
+from app_logic import display_contacts, add_contact, make_search_handler, make_scroll_handler
 
 def main(page: ft.Page):
     page.title = "Contact Book"
@@ -62,7 +62,6 @@ def main(page: ft.Page):
         label="🔍 Search Contact",
         width=350,
         border_radius=12,
-        on_change=lambda e: display_contacts(page, contacts_list_view, db_conn, e.control.value),
     )
 
     # ---------------- Dark Mode Switch ----------------
@@ -72,7 +71,10 @@ def main(page: ft.Page):
     )
 
     # ---------------- Contacts List ----------------
-    contacts_list_view = ft.ListView(expand=1, spacing=10, auto_scroll=True)
+    # Scrolls on its own so only the cards on screen are built; more pages load near the end
+    contacts_list_view = ft.ListView(height=450, spacing=10, on_scroll_interval=100)
+    contacts_list_view.on_scroll = make_scroll_handler(page, contacts_list_view, db_conn)
+    search_input.on_change = make_search_handler(page, contacts_list_view, db_conn)
 
     contacts_section = ft.Column(
         [